@@ -19,13 +19,20 @@ import json
 import logging
 import signal
 import sys
-from datetime import datetime
+from dataclasses import asdict
+from datetime import datetime, timezone
 from typing import Optional, List, Dict
+from urllib.parse import urlsplit
 
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config import AgentConfig
-from scanner import discover_cameras, get_local_ip, DiscoveredCamera
+from scanner import discover_cameras, get_local_ip, stop_onvif_discovery, DiscoveredCamera
 from relay import StreamRelayManager
 
 # Configure logging
@@ -36,6 +43,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger("vigila-agent")
 
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+def encode_json(body: dict) -> bytes:
+    """Serialize a request body to JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(body)
+    return json.dumps(body).encode()
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO 8601 string with second precision."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def decode_json(content: bytes):
+    """Parse a JSON response body (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
 
 class VigilaAgent:
     """
@@ -103,19 +131,22 @@ class VigilaAgent:
                 async with httpx.AsyncClient() as client:
                     response = await client.post(
                         f"{self.config.server_url}/api/agents/{self.agent_id}/heartbeat",
-                        json={
+                        content=encode_json({
                             "token": self.config.token,
                             "cameras_count": len(self.active_cameras),
                             "relay_status": self.relay_manager.get_status() if self.relay_manager else {},
-                            "timestamp": datetime.utcnow().isoformat()
-                        },
+                            "timestamp": utc_timestamp()
+                        }),
+                        headers=JSON_HEADERS,
                         timeout=10.0
                     )
                     
                     if response.status_code == 200:
-                        data = response.json()
-                        # Process any commands from server
-                        await self.process_commands(data.get("commands", []))
+                        data = decode_json(response.content)
+                        # Steady state is an empty command list, nothing to dispatch
+                        commands = data.get("commands")
+                        if commands:
+                            await self.process_commands(commands)
                     elif response.status_code == 404:
                         # Agent not found on server (server may have restarted)
                         logger.warning("Agent not found on server, re-registering...")
@@ -153,7 +184,7 @@ class VigilaAgent:
                     self.active_cameras[camera_id] = {
                         "rtsp_url": rtsp_url,
                         "stream_key": stream_key,
-                        "started_at": datetime.utcnow().isoformat()
+                        "started_at": utc_timestamp()
                     }
                     
             elif cmd_type == "stop_relay":
@@ -181,32 +212,31 @@ class VigilaAgent:
         """
         logger.info("Starting camera discovery...")
         
+        # Cameras already being relayed don't need to be found again
+        known_ips = {
+            urlsplit(info["rtsp_url"]).hostname
+            for info in self.active_cameras.values()
+        }
+        known_ips.discard(None)
+        
         self.discovered_cameras = await discover_cameras(
-            network_range=self.config.network_range
+            network_range=self.config.network_range,
+            skip_ips=known_ips,
+            scan_mode=self.config.scan_mode
         )
         
         # Report to server
         try:
             async with httpx.AsyncClient() as client:
-                cameras_data = [
-                    {
-                        "ip": cam.ip,
-                        "port": cam.port,
-                        "manufacturer": cam.manufacturer,
-                        "model": cam.model,
-                        "name": cam.name,
-                        "rtsp_url": cam.rtsp_url,
-                        "onvif_url": cam.onvif_url
-                    }
-                    for cam in self.discovered_cameras
-                ]
+                cameras_data = [asdict(cam) for cam in self.discovered_cameras]
                 
                 await client.post(
                     f"{self.config.server_url}/api/agents/{self.agent_id}/cameras",
-                    json={
+                    content=encode_json({
                         "token": self.config.token,
                         "cameras": cameras_data
-                    },
+                    }),
+                    headers=JSON_HEADERS,
                     timeout=30.0
                 )
                 
@@ -270,6 +300,8 @@ class VigilaAgent:
         if self.relay_manager:
             self.relay_manager.stop_all()
         
+        stop_onvif_discovery()
+        
         logger.info("Agent stopped.")
 
 
@@ -291,6 +323,13 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    # Use uvloop when available (not supported on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Run agent
     asyncio.run(agent.run())
 
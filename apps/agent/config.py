@@ -21,6 +21,7 @@ class AgentConfig:
     local_port: int = 8554
     heartbeat_interval: int = 30
     network_range: str = None
+    scan_mode: str = "connect"  # "connect" or "stateless" (raw SYN, needs root/CAP_NET_RAW)
     log_level: str = "INFO"
     
     @classmethod
@@ -44,5 +45,6 @@ class AgentConfig:
             local_port=int(os.getenv("LOCAL_PORT", "8554")),
             heartbeat_interval=int(os.getenv("HEARTBEAT_INTERVAL", "30")),
             network_range=os.getenv("NETWORK_RANGE"),
+            scan_mode=os.getenv("SCAN_MODE", "connect"),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
         )
@@ -4,14 +4,30 @@ Discovers cameras on the local network using ONVIF/WS-Discovery.
 """
 import socket
 import asyncio
+import errno
 import logging
-from typing import List, Optional
+import random
+import re
+import select
+import selectors
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Host and optional port from an ONVIF XAddr (e.g. http://192.168.1.10:8080/onvif/device_service)
+_XADDR_RE = re.compile(r'//([^:/]+)(?::(\d+))?')
 
-@dataclass
+# connect_ex results meaning a non-blocking connect is under way (10035 = WSAEWOULDBLOCK)
+_CONNECT_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}
+
+
+@dataclass(slots=True)
 class DiscoveredCamera:
     """Represents a discovered camera on the local network."""
     ip: str
@@ -44,6 +60,33 @@ def get_network_range(local_ip: str = None) -> str:
     return f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
 
 
+# Long-lived WS-Discovery instance, started on first use and reused across discovery cycles
+_wsd = None
+
+
+def _get_wsdiscovery():
+    """Return the shared WS-Discovery instance, starting it on first use."""
+    global _wsd
+    if _wsd is None:
+        from wsdiscovery.discovery import ThreadedWSDiscovery
+        
+        wsd = ThreadedWSDiscovery()
+        wsd.start()
+        _wsd = wsd
+    return _wsd
+
+
+def stop_onvif_discovery():
+    """Stop the shared WS-Discovery instance (threads and sockets), if running."""
+    global _wsd
+    if _wsd is not None:
+        try:
+            _wsd.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping WS-Discovery: {e}")
+        _wsd = None
+
+
 async def discover_onvif_cameras(timeout: int = 5) -> List[DiscoveredCamera]:
     """
     Discover cameras using WS-Discovery (ONVIF).
@@ -51,11 +94,9 @@ async def discover_onvif_cameras(timeout: int = 5) -> List[DiscoveredCamera]:
     cameras = []
     
     try:
-        from wsdiscovery.discovery import ThreadedWSDiscovery
         from wsdiscovery import QName
         
-        wsd = ThreadedWSDiscovery()
-        wsd.start()
+        wsd = _get_wsdiscovery()
         
         # Search for ONVIF devices
         # Use proper QName objects for WS-Discovery types
@@ -71,16 +112,11 @@ async def discover_onvif_cameras(timeout: int = 5) -> List[DiscoveredCamera]:
                 xaddrs = service.getXAddrs()
                 if xaddrs:
                     for addr in xaddrs:
-                        # Parse URL to get IP
-                        import re
-                        match = re.search(r'//([^:/]+)', addr)
+                        # Parse URL to get IP and port (default ONVIF port is 80)
+                        match = _XADDR_RE.search(addr)
                         if match:
                             ip = match.group(1)
-                            # Default ONVIF port is 80
-                            port = 80
-                            port_match = re.search(r':(\d+)', addr)
-                            if port_match:
-                                port = int(port_match.group(1))
+                            port = int(match.group(2)) if match.group(2) else 80
                             
                             camera = DiscoveredCamera(
                                 ip=ip,
@@ -94,8 +130,6 @@ async def discover_onvif_cameras(timeout: int = 5) -> List[DiscoveredCamera]:
             except Exception as e:
                 logger.debug(f"Error parsing service: {e}")
         
-        wsd.stop()
-        
     except ImportError:
         logger.warning("wsdiscovery not installed, skipping ONVIF discovery")
     except Exception as e:
@@ -104,9 +138,223 @@ async def discover_onvif_cameras(timeout: int = 5) -> List[DiscoveredCamera]:
     return cameras
 
 
-async def scan_common_ports(network_range: str = None, timeout: float = 0.5) -> List[DiscoveredCamera]:
+def _sweep_ports(
+    targets: List[Tuple[str, int]],
+    timeout: float,
+    max_probes: int,
+    max_scan_seconds: float
+) -> List[Tuple[str, int]]:
+    """
+    Check which (ip, port) targets accept TCP connections.
+    
+    Blocking: issues non-blocking connects and waits for all of them on a
+    single selector, keeping at most `max_probes` in flight. A probe that is
+    not writable within `timeout` is dropped, and the sweep stops once
+    `max_scan_seconds` have elapsed. Open targets are returned in input order.
+    """
+    open_indexes = []
+    pending = iter(enumerate(targets))
+    in_flight: Dict[socket.socket, float] = {}  # socket -> expiry, in start order
+    selector = selectors.DefaultSelector()
+    deadline = time.monotonic() + max_scan_seconds
+    
+    def finish(sock: socket.socket):
+        selector.unregister(sock)
+        sock.close()
+        del in_flight[sock]
+    
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                logger.warning(f"Port scan stopped after {max_scan_seconds}s, returning partial results")
+                break
+            
+            # Top up the in-flight window
+            while len(in_flight) < max_probes:
+                item = next(pending, None)
+                if item is None:
+                    break
+                index, target = item
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                err = sock.connect_ex(target)
+                if err == 0:
+                    open_indexes.append(index)
+                    sock.close()
+                elif err in _CONNECT_IN_PROGRESS:
+                    selector.register(sock, selectors.EVENT_WRITE, index)
+                    in_flight[sock] = now + timeout
+                else:
+                    sock.close()
+            
+            if not in_flight:
+                break
+            
+            # Probes share one timeout, so the oldest one expires first
+            next_expiry = next(iter(in_flight.values()))
+            wait = max(0.0, min(next_expiry, deadline) - now)
+            for key, _ in selector.select(wait):
+                sock = key.fileobj
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    open_indexes.append(key.data)
+                finish(sock)
+            
+            now = time.monotonic()
+            for sock in [s for s, expiry in in_flight.items() if expiry <= now]:
+                finish(sock)
+    finally:
+        for sock in list(in_flight):
+            finish(sock)
+        selector.close()
+    
+    return [targets[i] for i in sorted(open_indexes)]
+
+
+def can_stateless_scan() -> bool:
+    """Whether raw TCP sockets are available (Linux with root or CAP_NET_RAW)."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP).close()
+        return True
+    except OSError:
+        return False
+
+
+def _checksum(data: bytes) -> int:
+    """Internet checksum (RFC 1071)."""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _syn_cookie(ip: str, port: int, secret: int) -> int:
+    """Sequence number for a probe, so SYN-ACKs can be validated without state."""
+    return zlib.crc32(f"{ip}:{port}".encode(), secret) & 0xFFFFFFFF
+
+
+def _build_syn(src_ip: str, dst_ip: str, src_port: int, dst_port: int, seq: int) -> bytes:
+    """Build a bare TCP SYN segment (the kernel adds the IP header)."""
+    offset_flags = (5 << 12) | 0x02  # 20-byte header, SYN
+    header = struct.pack("!HHIIHHHH", src_port, dst_port, seq, 0, offset_flags, 64240, 0, 0)
+    pseudo_header = (
+        socket.inet_aton(src_ip)
+        + socket.inet_aton(dst_ip)
+        + struct.pack("!BBH", 0, socket.IPPROTO_TCP, len(header))
+    )
+    checksum = _checksum(pseudo_header + header)
+    return header[:16] + struct.pack("!H", checksum) + header[18:]
+
+
+def _syn_sweep(
+    targets: List[Tuple[str, int]],
+    src_ip: str,
+    timeout: float,
+    max_scan_seconds: float
+) -> List[Tuple[str, int]]:
+    """
+    Stateless SYN scan of (ip, port) targets over raw sockets.
+    
+    Blocking: a sender thread fires one SYN per target while this thread
+    collects SYN-ACKs whose acknowledgement matches the probe cookie. No
+    connection state is kept; the kernel answers the SYN-ACKs with a RST.
+    Listening stops `timeout` seconds after the last SYN or once
+    `max_scan_seconds` have elapsed. Open targets are returned in input order.
+    """
+    secret = random.getrandbits(32)
+    src_port = random.randint(40000, 60000)
+    index_by_target = {target: i for i, target in enumerate(targets)}
+    open_indexes = set()
+    sent_all = threading.Event()
+    stop = threading.Event()
+    
+    recv_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    recv_sock.setblocking(False)
+    
+    def send_all():
+        try:
+            for ip, port in targets:
+                if stop.is_set():
+                    break
+                packet = _build_syn(src_ip, ip, src_port, port, _syn_cookie(ip, port, secret))
+                try:
+                    send_sock.sendto(packet, (ip, 0))
+                except OSError as e:
+                    logger.debug(f"SYN to {ip}:{port} failed: {e}")
+        finally:
+            sent_all.set()
+    
+    sender = threading.Thread(target=send_all, name="syn-sweep-sender", daemon=True)
+    deadline = time.monotonic() + max_scan_seconds
+    listen_until = None
+    
+    try:
+        sender.start()
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                logger.warning(f"Port scan stopped after {max_scan_seconds}s, returning partial results")
+                break
+            if listen_until is None and sent_all.is_set():
+                listen_until = now + timeout
+            if listen_until is not None and now >= listen_until:
+                break
+            
+            readable, _, _ = select.select([recv_sock], [], [], 0.05)
+            if not readable:
+                continue
+            
+            while True:
+                try:
+                    packet = recv_sock.recv(65535)
+                except BlockingIOError:
+                    break
+                
+                ihl = (packet[0] & 0x0F) * 4
+                if len(packet) < ihl + 14:
+                    continue
+                sport, dport, _, ack, offset_flags = struct.unpack("!HHIIH", packet[ihl:ihl + 14])
+                if dport != src_port or offset_flags & 0x12 != 0x12:
+                    continue
+                
+                target = (socket.inet_ntoa(packet[12:16]), sport)
+                index = index_by_target.get(target)
+                if index is not None and ack == (_syn_cookie(*target, secret) + 1) & 0xFFFFFFFF:
+                    open_indexes.add(index)
+    finally:
+        stop.set()
+        sender.join(timeout=1.0)
+        send_sock.close()
+        recv_sock.close()
+    
+    return [targets[i] for i in sorted(open_indexes)]
+
+
+async def scan_common_ports(
+    network_range: str = None,
+    timeout: float = 0.5,
+    max_probes: int = 60,
+    max_scan_seconds: float = 30.0,
+    skip_ips: Optional[Set[str]] = None,
+    scan_mode: str = "connect"
+) -> List[DiscoveredCamera]:
     """
     Scan common RTSP ports in the network.
+    
+    Hosts in `skip_ips` (cameras the agent already knows about) are not probed.
+    At most `max_probes` connections (clamped to 5-200) are in flight at once,
+    and the whole sweep stops after `max_scan_seconds`, returning whatever was
+    found so far. The sweep runs in a worker thread so the event loop stays free.
+    
+    With `scan_mode="stateless"` a raw-socket SYN scan is used instead when
+    the agent is allowed to open raw sockets; otherwise it falls back to the
+    connect sweep.
     """
     cameras = []
     common_ports = [554, 8554, 80, 8080]
@@ -118,42 +366,62 @@ async def scan_common_ports(network_range: str = None, timeout: float = 0.5) ->
     base_ip = network_range.split("/")[0]
     base_parts = base_ip.split(".")[:3]
     
-    async def check_port(ip: str, port: int) -> Optional[DiscoveredCamera]:
-        try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(ip, port),
-                timeout=timeout
-            )
-            writer.close()
-            await writer.wait_closed()
-            return DiscoveredCamera(ip=ip, port=port)
-        except:
-            return None
-    
-    # Scan IPs 1-254
-    tasks = []
-    for i in range(1, 255):
-        ip = f"{base_parts[0]}.{base_parts[1]}.{base_parts[2]}.{i}"
-        for port in common_ports:
-            tasks.append(check_port(ip, port))
+    # Scan IPs 1-254, except already known hosts
+    skip_ips = skip_ips or set()
+    targets = [
+        (ip, port)
+        for ip in (f"{base_parts[0]}.{base_parts[1]}.{base_parts[2]}.{i}" for i in range(1, 255))
+        if ip not in skip_ips
+        for port in common_ports
+    ]
     
     logger.info(f"Scanning {network_range} for cameras...")
-    results = await asyncio.gather(*tasks)
+    loop = asyncio.get_running_loop()
+    if scan_mode == "stateless" and not can_stateless_scan():
+        logger.warning("Stateless scan needs raw socket access (Linux, root/CAP_NET_RAW), using connect scan")
+        scan_mode = "connect"
+    
+    if scan_mode == "stateless":
+        open_ports = await loop.run_in_executor(
+            None,
+            _syn_sweep,
+            targets,
+            get_local_ip(),
+            timeout,
+            max_scan_seconds
+        )
+    else:
+        open_ports = await loop.run_in_executor(
+            None,
+            _sweep_ports,
+            targets,
+            timeout,
+            max(5, min(max_probes, 200)),
+            max_scan_seconds
+        )
     
     # Filter found devices
     found_ips = set()
-    for result in results:
-        if result and result.ip not in found_ips:
-            cameras.append(result)
-            found_ips.add(result.ip)
-            logger.info(f"Found potential camera at {result.ip}:{result.port}")
+    for ip, port in open_ports:
+        if ip not in found_ips:
+            cameras.append(DiscoveredCamera(ip=ip, port=port))
+            found_ips.add(ip)
+            logger.info(f"Found potential camera at {ip}:{port}")
     
     return cameras
 
 
-async def discover_cameras(network_range: str = None, timeout: int = 5) -> List[DiscoveredCamera]:
+async def discover_cameras(
+    network_range: str = None,
+    timeout: int = 5,
+    skip_ips: Optional[Set[str]] = None,
+    scan_mode: str = "connect"
+) -> List[DiscoveredCamera]:
     """
     Discover cameras using multiple methods.
+    
+    `skip_ips` are excluded from the port scan (e.g. cameras already relaying).
+    `scan_mode` selects the port scan implementation ("connect" or "stateless").
     """
     all_cameras = []
     seen_ips = set()
@@ -169,7 +437,12 @@ async def discover_cameras(network_range: str = None, timeout: int = 5) -> List[
     # Method 2: Port scanning (if ONVIF found nothing)
     if not all_cameras:
         logger.info("No ONVIF cameras found, scanning common ports...")
-        port_cameras = await scan_common_ports(network_range, timeout=0.3)
+        port_cameras = await scan_common_ports(
+            network_range,
+            timeout=0.3,
+            skip_ips=skip_ips,
+            scan_mode=scan_mode
+        )
         for cam in port_cameras:
             if cam.ip not in seen_ips:
                 all_cameras.append(cam)
@@ -4,7 +4,9 @@ from contextlib import asynccontextmanager
 from database import engine, Base, AsyncSessionLocal
 from routers import cameras, recordings, storage, tenants, locations, users, agents, user_management
 from services.storage_manager import start_storage_manager, stop_storage_manager
+from services.recording_index import start_recording_indexer, stop_recording_indexer
 from services.mediamtx import restore_camera_path, sanitize_path_name
+from services.onvif_config import close_onvif_clients
 from sqlalchemy.future import select
 from models import Camera, Tenant, Location
 import asyncio
@@ -67,10 +69,19 @@ async def lifespan(app: FastAPI):
     # Start storage cleanup manager
     await start_storage_manager()
     
+    # Start indexing recordings for search
+    await start_recording_indexer()
+    
     yield
     
+    # Stop recording indexer on shutdown
+    await stop_recording_indexer()
+    
     # Stop storage cleanup manager on shutdown
     await stop_storage_manager()
+    
+    # Close pooled ONVIF client sessions
+    await close_onvif_clients()
 
 from fastapi.staticfiles import StaticFiles
 import os
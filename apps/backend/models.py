@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, BigInteger, Text, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, BigInteger, Text, Table, Index, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from database import Base
+from services.mediamtx import sanitize_name, sanitize_path_name
 import enum
 
 
@@ -168,6 +169,8 @@ class Camera(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
+    path_name = Column(String, nullable=True, index=True)  # MediaMTX path, derived from name
+    name_sanitized = Column(String, nullable=True, index=True)  # Legacy /recordings/{name} folder, derived from name
     rtsp_url = Column(String, index=True)  # Removed unique constraint for multi-tenant
     is_active = Column(Boolean, default=True)
     is_recording = Column(Boolean, default=True)  # Whether recording is enabled for this camera
@@ -189,6 +192,17 @@ class Camera(Base):
     location = relationship("Location", back_populates="cameras")
     recordings = relationship("RecordingLog", back_populates="camera")
 
+    # Fetch created_at/updated_at from INSERT/UPDATE ... RETURNING, so routes
+    # can serialize the row after commit without a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    @validates("name")
+    def _set_path_name(self, key, name):
+        """Keep path_name and name_sanitized in step with name, so readers never re-sanitize it."""
+        self.path_name = sanitize_path_name(name) if name is not None else None
+        self.name_sanitized = sanitize_name(name) if name is not None else None
+        return name
+
 
 class StorageVolume(Base):
     """Storage volume configuration for recordings."""
@@ -249,6 +263,29 @@ class RecordingLog(Base):
     camera = relationship("Camera", back_populates="recordings")
 
 
+class RecordingFile(Base):
+    """
+    Index of the MP4 segments under /recordings.
+    Kept in sync with the filesystem by the recording indexer, so recording
+    searches are SQL queries instead of directory scans.
+    """
+    __tablename__ = "recording_files"
+    __table_args__ = (
+        UniqueConstraint("folder_name", "filename"),
+        Index("ix_recording_files_camera_start", "camera_id", "start_time"),
+        # Keyset pagination across cameras seeks on (start_time, id)
+        Index("ix_recording_files_start_id", "start_time", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="CASCADE"), nullable=False)
+    folder_name = Column(String, nullable=False)  # Relative to /recordings, e.g. tenant_1/location_1/camera_1
+    filename = Column(String, nullable=False)     # YYYY-MM-DD_HH-MM-SS.mp4
+    start_time = Column(DateTime, nullable=False, index=True)  # Local time, as in the filename
+    file_size = Column(BigInteger, default=0)
+    duration_seconds = Column(Integer, nullable=True)  # Probed once the segment is finished
+
+
 # =============================================================================
 # Local Agent Model
 # =============================================================================
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_
-from typing import List, Optional
-from pydantic import BaseModel
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, literal, update
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from database import get_db
 from models import Camera, Location, Tenant, Agent
 from schemas import CameraCreate, CameraResponse, CameraUpdate
+from routers.recordings import invalidate_camera_caches
 from services.mediamtx import (
     add_camera_path,
     update_camera_path,
@@ -19,16 +23,21 @@ from services.mediamtx import (
     get_recording_status
 )
 from services.network_scanner import (
-    discover_cameras,
+    discover_cameras_cached,
+    iter_discovered_cameras,
     DiscoveredCamera,
-    get_local_network_range
+    get_cached_network_range
 )
 from services.onvif_config import (
-    get_camera_video_config,
+    DeviceBusyError,
+    get_camera_video_config_cached,
     update_camera_video_config
 )
+from services.stream_probe import VIDEO_CODECS, pyav_available, probe_rtsp_pyav, run_ffprobe
 import aiohttp
 import asyncio
+import json
+import re
 
 
 # Pydantic models for ONVIF configuration
@@ -61,6 +70,67 @@ class RTSPTestRequest(BaseModel):
     timeout: int = 5
 
 
+# Maximum concurrent MediaMTX path updates during /sync
+SYNC_CONCURRENCY = 16
+
+# Cameras loaded from the database per batch during /sync
+SYNC_BATCH_SIZE = 500
+
+# Host and optional port of an RTSP URL (credentials skipped)
+_RTSP_URL_RE = re.compile(r'rtsp://(?:[^:@]+(?::[^@]+)?@)?([^:/]+)(?::(\d+))?')
+
+# Validates ORM rows and serializes them to JSON bytes in a single pydantic-core
+# pass, for the camera list that the UI polls
+_camera_list_adapter = TypeAdapter(List[CameraResponse])
+
+# Discovery results are encoded straight from the dataclasses, without an
+# asdict() copy of every camera
+_discovered_camera_adapter = TypeAdapter(DiscoveredCamera)
+_discovery_result_adapter = TypeAdapter(Dict[str, Any])
+
+# Error detail per recording action when MediaMTX rejects the change
+_RECORDING_ERRORS = {
+    "start": "Failed to start recording in MediaMTX",
+    "stop": "Failed to stop recording in MediaMTX",
+    "toggle": "Failed to update recording state in MediaMTX",
+}
+
+
+def _json_body(model):
+    """
+    Dependency that parses the request body with model.model_validate_json,
+    in one pydantic-core pass instead of json.loads followed by validation.
+    Errors are reported as the usual 422 response.
+    """
+    async def parse(request: Request):
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+    return parse
+
+
+def _json_body_openapi(model) -> dict:
+    """openapi_extra documenting a body parsed by _json_body(model)."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
+
+
+def _path_name(camera: Camera) -> str:
+    """
+    MediaMTX path of a camera. Rows created before the path_name column
+    existed fall back to sanitizing the name.
+    """
+    return camera.path_name or sanitize_path_name(camera.name)
+
+
 router = APIRouter(
     prefix="/api/cameras",
     tags=["cameras"],
@@ -82,46 +152,62 @@ async def test_rtsp_connection(request: RTSPTestRequest):
     rtsp_url = request.rtsp_url
     timeout = request.timeout
     
+    # Probe in-process with PyAV when available (no ffprobe spawn per test)
+    if pyav_available():
+        loop = asyncio.get_running_loop()
+        try:
+            video_info = await asyncio.wait_for(
+                loop.run_in_executor(None, probe_rtsp_pyav, rtsp_url, timeout),
+                timeout=timeout + 2
+            )
+            return {
+                "success": True,
+                "message": "Connection successful",
+                "video_info": video_info
+            }
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "message": "Connection timeout",
+                "video_info": None
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to connect: {str(e)[:200]}",
+                "video_info": None
+            }
+    
     try:
         # Try to connect using ffprobe to validate the stream
-        import subprocess
-        
-        # Use ffprobe to test the stream
-        cmd = [
-            "ffprobe",
+        timeout_us = str(timeout * 1000000)  # Convert to microseconds
+        args = [
             "-v", "error",
             "-rtsp_transport", "tcp",
+            # Socket and read timeouts so ffprobe can't hang in the handshake
+            "-timeout", timeout_us,
+            "-rw_timeout", timeout_us,
             "-i", rtsp_url,
+            "-select_streams", "v",
             "-show_entries", "stream=codec_name,width,height,r_frame_rate",
-            "-of", "json",
-            "-timeout", str(timeout * 1000000)  # Convert to microseconds
+            # One "codec,width,height,rate" line per video stream
+            "-of", "csv=p=0:nk=1"
         ]
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
         try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout + 2
-            )
+            returncode, stdout, stderr = await run_ffprobe(args, timeout + 2)
             
-            if process.returncode == 0:
-                import json
-                info = json.loads(stdout.decode())
-                streams = info.get("streams", [])
-                
+            if returncode == 0:
                 video_info = None
-                for stream in streams:
-                    if stream.get("codec_name") in ["h264", "h265", "hevc", "mjpeg"]:
+                for line in stdout.decode().splitlines():
+                    fields = line.strip().split(",")
+                    if len(fields) == 4 and fields[0] in VIDEO_CODECS:
+                        codec, width, height, framerate = fields
                         video_info = {
-                            "codec": stream.get("codec_name"),
-                            "width": stream.get("width"),
-                            "height": stream.get("height"),
-                            "framerate": stream.get("r_frame_rate")
+                            "codec": codec,
+                            "width": int(width) if width.isdigit() else None,
+                            "height": int(height) if height.isdigit() else None,
+                            "framerate": framerate
                         }
                         break
                 
@@ -139,7 +225,6 @@ async def test_rtsp_connection(request: RTSPTestRequest):
                 }
                 
         except asyncio.TimeoutError:
-            process.kill()
             return {
                 "success": False,
                 "message": "Connection timeout",
@@ -150,8 +235,7 @@ async def test_rtsp_connection(request: RTSPTestRequest):
         # ffprobe not available, try simple socket test
         try:
             # Parse RTSP URL to get host and port
-            import re
-            match = re.match(r'rtsp://(?:[^:@]+(?::[^@]+)?@)?([^:/]+)(?::(\d+))?', rtsp_url)
+            match = _RTSP_URL_RE.match(rtsp_url)
             if match:
                 host = match.group(1)
                 port = int(match.group(2) or 554)
@@ -185,21 +269,53 @@ async def test_rtsp_connection(request: RTSPTestRequest):
         }
 
 
+async def _fetch_camera_references(
+    db: AsyncSession,
+    tenant_id: Optional[int],
+    location_id: Optional[int],
+    duplicate_query=None
+) -> Tuple[Optional[Tenant], Optional[Location], bool]:
+    """
+    Load the tenant and location a camera refers to, and whether
+    `duplicate_query` (a select of conflicting cameras) matches anything,
+    in a single round-trip.
+    
+    Returns (tenant, location, is_duplicate); tenant/location are None when
+    the id is None or doesn't exist.
+    """
+    is_duplicate = duplicate_query.exists() if duplicate_query is not None else literal(False)
+    anchor = select(literal(1).label("anchor")).subquery()
+    result = await db.execute(
+        select(Tenant, Location, is_duplicate.label("is_duplicate"))
+        .select_from(anchor)
+        .outerjoin(Tenant, Tenant.id == tenant_id)
+        .outerjoin(Location, Location.id == location_id)
+    )
+    tenant, location, duplicate = result.one()
+    return tenant, location, bool(duplicate)
+
+
 @router.post("", response_model=CameraResponse)
 async def create_camera(camera: CameraCreate, db: AsyncSession = Depends(get_db)):
+    # Unique constraint: same name in same tenant/location
+    duplicate_query = None
+    if camera.tenant_id is not None and camera.location_id is not None:
+        duplicate_query = select(Camera.id).filter(
+            Camera.tenant_id == camera.tenant_id,
+            Camera.location_id == camera.location_id,
+            Camera.name == camera.name
+        )
+    
+    tenant, location, is_duplicate = await _fetch_camera_references(
+        db, camera.tenant_id, camera.location_id, duplicate_query
+    )
+    
     # Validate tenant_id if provided
-    tenant = None
-    if camera.tenant_id is not None:
-        tenant_result = await db.execute(select(Tenant).filter(Tenant.id == camera.tenant_id))
-        tenant = tenant_result.scalars().first()
-        if tenant is None:
-            raise HTTPException(status_code=400, detail="Invalid tenant_id: Tenant not found")
+    if camera.tenant_id is not None and tenant is None:
+        raise HTTPException(status_code=400, detail="Invalid tenant_id: Tenant not found")
     
     # Validate location_id if provided
-    location = None
     if camera.location_id is not None:
-        location_result = await db.execute(select(Location).filter(Location.id == camera.location_id))
-        location = location_result.scalars().first()
         if location is None:
             raise HTTPException(status_code=400, detail="Invalid location_id: Location not found")
         
@@ -210,19 +326,11 @@ async def create_camera(camera: CameraCreate, db: AsyncSession = Depends(get_db)
                 detail="Location does not belong to the specified tenant"
             )
     
-    # Check for unique constraint: same name in same tenant/location
-    if camera.tenant_id is not None and camera.location_id is not None:
-        existing_query = select(Camera).filter(
-            Camera.tenant_id == camera.tenant_id,
-            Camera.location_id == camera.location_id,
-            Camera.name == camera.name
+    if is_duplicate:
+        raise HTTPException(
+            status_code=400,
+            detail="A camera with this name already exists in this location"
         )
-        existing_result = await db.execute(existing_query)
-        if existing_result.scalars().first() is not None:
-            raise HTTPException(
-                status_code=400,
-                detail="A camera with this name already exists in this location"
-            )
     
     # Create camera in database
     db_camera = Camera(
@@ -236,11 +344,10 @@ async def create_camera(camera: CameraCreate, db: AsyncSession = Depends(get_db)
     )
     db.add(db_camera)
     await db.commit()
-    await db.refresh(db_camera)
     
     # Add camera path to MediaMTX with intelligent mode detection
     # Pass tenant_slug and location_name for recording path organization
-    path_name = sanitize_path_name(camera.name)
+    path_name = db_camera.path_name
     tenant_slug = tenant.slug if tenant else None
     location_name = location.name if location else None
     
@@ -284,7 +391,6 @@ async def create_camera(camera: CameraCreate, db: AsyncSession = Depends(get_db)
         if camera.stream_mode == "auto" and final_mode in ["direct", "ffmpeg"]:
             db_camera.stream_mode = final_mode
             await db.commit()
-            await db.refresh(db_camera)
             print(f"Camera {camera.name}: auto-detected mode is '{final_mode}'")
     
     if not success:
@@ -311,39 +417,50 @@ async def read_cameras(
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     cameras = result.scalars().all()
-    return cameras
+    # Skip FastAPI's response_model round-trip (validate, jsonable_encoder, json.dumps)
+    cameras = _camera_list_adapter.validate_python(cameras, from_attributes=True)
+    return Response(content=_camera_list_adapter.dump_json(cameras), media_type="application/json")
 
 @router.get("/{camera_id}", response_model=CameraResponse)
 async def read_camera(camera_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    camera = result.scalars().first()
+    camera = await db.get(Camera, camera_id)
     if camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     return camera
 
 @router.put("/{camera_id}", response_model=CameraResponse)
 async def update_camera(camera_id: int, camera: CameraUpdate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    db_camera = result.scalars().first()
+    db_camera = await db.get(Camera, camera_id)
     if db_camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    old_path_name = sanitize_path_name(db_camera.name)
+    old_path_name = _path_name(db_camera)
     
-    # Validate tenant_id if provided
     new_tenant_id = camera.tenant_id if camera.tenant_id is not None else db_camera.tenant_id
     new_location_id = camera.location_id if camera.location_id is not None else db_camera.location_id
     
-    if camera.tenant_id is not None:
-        tenant_result = await db.execute(select(Tenant).filter(Tenant.id == camera.tenant_id))
-        tenant = tenant_result.scalars().first()
-        if tenant is None:
-            raise HTTPException(status_code=400, detail="Invalid tenant_id: Tenant not found")
+    # Check unique constraint if name, tenant or location is being changed
+    new_name = camera.name if camera.name is not None else db_camera.name
+    duplicate_query = None
+    if new_tenant_id is not None and new_location_id is not None:
+        if camera.name is not None or camera.tenant_id is not None or camera.location_id is not None:
+            duplicate_query = select(Camera.id).filter(
+                Camera.tenant_id == new_tenant_id,
+                Camera.location_id == new_location_id,
+                Camera.name == new_name,
+                Camera.id != camera_id  # Exclude current camera
+            )
+    
+    tenant, location, is_duplicate = await _fetch_camera_references(
+        db, camera.tenant_id, camera.location_id, duplicate_query
+    )
+    
+    # Validate tenant_id if provided
+    if camera.tenant_id is not None and tenant is None:
+        raise HTTPException(status_code=400, detail="Invalid tenant_id: Tenant not found")
     
     # Validate location_id if provided
     if camera.location_id is not None:
-        location_result = await db.execute(select(Location).filter(Location.id == camera.location_id))
-        location = location_result.scalars().first()
         if location is None:
             raise HTTPException(status_code=400, detail="Invalid location_id: Location not found")
         
@@ -354,22 +471,11 @@ async def update_camera(camera_id: int, camera: CameraUpdate, db: AsyncSession =
                 detail="Location does not belong to the specified tenant"
             )
     
-    # Check unique constraint if name is being changed
-    new_name = camera.name if camera.name is not None else db_camera.name
-    if new_tenant_id is not None and new_location_id is not None:
-        if camera.name is not None or camera.tenant_id is not None or camera.location_id is not None:
-            existing_query = select(Camera).filter(
-                Camera.tenant_id == new_tenant_id,
-                Camera.location_id == new_location_id,
-                Camera.name == new_name,
-                Camera.id != camera_id  # Exclude current camera
-            )
-            existing_result = await db.execute(existing_query)
-            if existing_result.scalars().first() is not None:
-                raise HTTPException(
-                    status_code=400,
-                    detail="A camera with this name already exists in this location"
-                )
+    if is_duplicate:
+        raise HTTPException(
+            status_code=400,
+            detail="A camera with this name already exists in this location"
+        )
     
     # Update fields if provided
     if camera.name is not None:
@@ -385,9 +491,14 @@ async def update_camera(camera_id: int, camera: CameraUpdate, db: AsyncSession =
     if camera.location_id is not None:
         db_camera.location_id = camera.location_id
     
-    new_path_name = sanitize_path_name(db_camera.name)
+    new_path_name = _path_name(db_camera)
     mode = db_camera.stream_mode
     
+    # Commit before talking to MediaMTX, so the DB connection isn't held
+    # while the path is (re)configured
+    await db.commit()
+    invalidate_camera_caches()
+    
     # If name changed, remove old path
     if old_path_name != new_path_name:
         await remove_camera_path(old_path_name)
@@ -398,115 +509,67 @@ async def update_camera(camera_id: int, camera: CameraUpdate, db: AsyncSession =
     # Update mode if auto-detection changed it
     if mode == "auto" and final_mode in ["direct", "ffmpeg"]:
         db_camera.stream_mode = final_mode
+        await db.commit()
     
-    await db.commit()
-    await db.refresh(db_camera)
     return db_camera
 
 @router.delete("/{camera_id}")
-async def delete_camera(camera_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    db_camera = result.scalars().first()
+async def delete_camera(
+    camera_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    db_camera = await db.get(Camera, camera_id)
     if db_camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    # Remove camera path from MediaMTX
-    path_name = sanitize_path_name(db_camera.name)
-    await remove_camera_path(path_name)
+    path_name = _path_name(db_camera)
     
     await db.delete(db_camera)
     await db.commit()
+    invalidate_camera_caches()
+    
+    # Remove camera path from MediaMTX after the response; removal is
+    # idempotent and /sync heals any drift
+    background_tasks.add_task(remove_camera_path, path_name)
     return {"message": "Camera deleted successfully"}
 
 
-@router.post("/{camera_id}/recording/toggle", response_model=CameraResponse)
-async def toggle_camera_recording(camera_id: int, db: AsyncSession = Depends(get_db)):
+@router.post("/{camera_id}/recording/{action}", response_model=CameraResponse)
+async def set_camera_recording(
+    camera_id: int,
+    action: Literal["start", "stop", "toggle"],
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Toggle recording on/off for a camera.
+    Start, stop or toggle recording for a camera.
     
     This pauses or resumes recording without stopping the stream.
     The camera will still be visible in live view, but won't save to disk.
     """
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    db_camera = result.scalars().first()
+    db_camera = await db.get(Camera, camera_id)
     if db_camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    # Toggle recording state
-    new_state = not db_camera.is_recording
-    path_name = sanitize_path_name(db_camera.name)
+    if action == "toggle":
+        new_state = not db_camera.is_recording
+    else:
+        new_state = action == "start"
+        if db_camera.is_recording == new_state:
+            return db_camera  # Already in the requested state
     
     # Update MediaMTX
+    path_name = _path_name(db_camera)
     success = await set_recording_enabled(path_name, new_state)
     if not success:
         raise HTTPException(
             status_code=500, 
-            detail="Failed to update recording state in MediaMTX"
+            detail=_RECORDING_ERRORS[action]
         )
     
     # Update database
     db_camera.is_recording = new_state
     await db.commit()
-    await db.refresh(db_camera)
-    
-    return db_camera
-
-
-@router.post("/{camera_id}/recording/start", response_model=CameraResponse)
-async def start_camera_recording(camera_id: int, db: AsyncSession = Depends(get_db)):
-    """
-    Start recording for a camera.
-    """
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    db_camera = result.scalars().first()
-    if db_camera is None:
-        raise HTTPException(status_code=404, detail="Camera not found")
-    
-    if db_camera.is_recording:
-        return db_camera  # Already recording
-    
-    path_name = sanitize_path_name(db_camera.name)
-    success = await set_recording_enabled(path_name, True)
-    if not success:
-        raise HTTPException(
-            status_code=500, 
-            detail="Failed to start recording in MediaMTX"
-        )
-    
-    db_camera.is_recording = True
-    await db.commit()
-    await db.refresh(db_camera)
-    
-    return db_camera
-
-
-@router.post("/{camera_id}/recording/stop", response_model=CameraResponse)
-async def stop_camera_recording(camera_id: int, db: AsyncSession = Depends(get_db)):
-    """
-    Stop recording for a camera.
-    
-    The camera stream will continue to be available for live view,
-    but no new recordings will be saved to disk.
-    """
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    db_camera = result.scalars().first()
-    if db_camera is None:
-        raise HTTPException(status_code=404, detail="Camera not found")
-    
-    if not db_camera.is_recording:
-        return db_camera  # Already stopped
-    
-    path_name = sanitize_path_name(db_camera.name)
-    success = await set_recording_enabled(path_name, False)
-    if not success:
-        raise HTTPException(
-            status_code=500, 
-            detail="Failed to stop recording in MediaMTX"
-        )
-    
-    db_camera.is_recording = False
-    await db.commit()
-    await db.refresh(db_camera)
     
     return db_camera
 
@@ -518,12 +581,11 @@ async def get_camera_recording_status(camera_id: int, db: AsyncSession = Depends
     
     Returns both the database state and the actual MediaMTX state.
     """
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    db_camera = result.scalars().first()
+    db_camera = await db.get(Camera, camera_id)
     if db_camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    path_name = sanitize_path_name(db_camera.name)
+    path_name = _path_name(db_camera)
     mediamtx_status = await get_recording_status(path_name)
     
     return {
@@ -536,13 +598,12 @@ async def get_camera_recording_status(camera_id: int, db: AsyncSession = Depends
 
 @router.get("/{camera_id}/stream")
 async def get_camera_stream(camera_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    camera = result.scalars().first()
+    camera = await db.get(Camera, camera_id)
     if camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
     # Use the sanitized camera name as the stream path
-    stream_name = sanitize_path_name(camera.name)
+    stream_name = _path_name(camera)
     hls_url = f"http://localhost:8888/{stream_name}/index.m3u8"
     
     return {"stream_url": hls_url}
@@ -555,51 +616,113 @@ async def get_active_streams():
     return {"streams": paths}
 
 
-@router.post("/sync")
-async def sync_cameras_to_mediamtx(db: AsyncSession = Depends(get_db)):
+async def _sync_cameras(db: AsyncSession):
     """
-    Synchronize all cameras from database to MediaMTX.
-    Uses intelligent mode detection for cameras set to 'auto'.
+    Push every active camera to MediaMTX, yielding one result dict per camera.
+    
+    Cameras are streamed from the database SYNC_BATCH_SIZE at a time, so memory
+    stays bounded and the first MediaMTX calls start before all rows are loaded.
     """
-    # Get all active cameras with their tenant and location info
-    result = await db.execute(
-        select(Camera, Tenant, Location)
-        .outerjoin(Tenant, Camera.tenant_id == Tenant.id)
-        .outerjoin(Location, Camera.location_id == Location.id)
+    # MediaMTX calls are independent per camera; run them concurrently but bounded
+    semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+    
+    async def sync_one(camera):
+        path_name = _path_name(camera)
+        mode = camera.stream_mode or "auto"
+        tenant_slug = camera.tenant.slug if camera.tenant else None
+        location_name = camera.location.name if camera.location else None
+        
+        async with semaphore:
+            try:
+                success, final_mode = await add_camera_path(
+                    path_name, 
+                    camera.rtsp_url, 
+                    mode,
+                    tenant_slug=tenant_slug,
+                    location_name=location_name
+                )
+            except Exception as e:
+                # One broken camera must not abort the rest of the batch
+                print(f"Error syncing camera {camera.name}: {e}")
+                success, final_mode = False, "failed"
+        return camera, path_name, mode, tenant_slug, location_name, success, final_mode
+    
+    # Get all active cameras, eager-loading their tenant and location per batch
+    result = await db.stream(
+        select(Camera)
+        .options(selectinload(Camera.tenant), selectinload(Camera.location))
         .filter(Camera.is_active == True)
+        .execution_options(yield_per=SYNC_BATCH_SIZE)
     )
-    rows = result.all()
     
-    synced = []
-    failed = []
+    detected_modes = {}  # final_mode -> [camera_id, ...]
     
-    for camera, tenant, location in rows:
-        path_name = sanitize_path_name(camera.name)
-        mode = camera.stream_mode or "auto"
-        tenant_slug = tenant.slug if tenant else None
-        location_name = location.name if location else None
-        
-        success, final_mode = await add_camera_path(
-            path_name, 
-            camera.rtsp_url, 
-            mode,
-            tenant_slug=tenant_slug,
-            location_name=location_name
-        )
+    async for cameras in result.scalars().partitions():
+        results = await asyncio.gather(*(sync_one(camera) for camera in cameras))
         
-        if success:
-            synced.append({
+        for camera, path_name, mode, tenant_slug, location_name, success, final_mode in results:
+            # Update mode in database if auto-detection changed it
+            if success and mode == "auto" and final_mode in ["direct", "ffmpeg"]:
+                detected_modes.setdefault(final_mode, []).append(camera.id)
+            yield {
                 "name": camera.name,
+                "success": success,
                 "mode": final_mode,
                 "record_path": f"/recordings/{tenant_slug or 'default'}/{location_name or 'default'}/{path_name}" if tenant_slug else f"/recordings/{path_name}"
-            })
-            # Update mode in database if auto-detection changed it
-            if mode == "auto" and final_mode in ["direct", "ffmpeg"]:
-                camera.stream_mode = final_mode
-        else:
-            failed.append(camera.name)
+            }
     
+    # One UPDATE per detected mode instead of flushing each camera. The synced
+    # Camera objects aren't read again, so skip matching them in the session.
+    for final_mode, camera_ids in detected_modes.items():
+        await db.execute(
+            update(Camera)
+            .where(Camera.id.in_(camera_ids))
+            .values(stream_mode=final_mode)
+            .execution_options(synchronize_session=False)
+        )
     await db.commit()
+
+
+@router.post("/sync")
+async def sync_cameras_to_mediamtx(
+    stream: bool = Query(False, description="Stream per-camera progress as NDJSON"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Synchronize all cameras from database to MediaMTX.
+    Uses intelligent mode detection for cameras set to 'auto'.
+    
+    With stream=true, one JSON line is sent per camera as soon as it is synced,
+    followed by a summary line.
+    """
+    if stream:
+        async def progress():
+            synced = failed = 0
+            async for item in _sync_cameras(db):
+                if item["success"]:
+                    synced += 1
+                else:
+                    failed += 1
+                yield json.dumps(item) + "\n"
+            yield json.dumps({
+                "message": f"Synced {synced} cameras",
+                "synced": synced,
+                "failed": failed
+            }) + "\n"
+        
+        return StreamingResponse(progress(), media_type="application/x-ndjson")
+    
+    synced = []
+    failed = []
+    async for item in _sync_cameras(db):
+        if item["success"]:
+            synced.append({
+                "name": item["name"],
+                "mode": item["mode"],
+                "record_path": item["record_path"]
+            })
+        else:
+            failed.append(item["name"])
     
     return {
         "message": f"Synced {len(synced)} cameras",
@@ -619,20 +742,18 @@ async def resync_camera(camera_id: int, force_mode: str = None, db: AsyncSession
     """
     # Get camera with tenant and location info
     result = await db.execute(
-        select(Camera, Tenant, Location)
-        .outerjoin(Tenant, Camera.tenant_id == Tenant.id)
-        .outerjoin(Location, Camera.location_id == Location.id)
+        select(Camera)
+        .options(selectinload(Camera.tenant), selectinload(Camera.location))
         .filter(Camera.id == camera_id)
     )
-    row = result.first()
-    if row is None:
+    camera = result.scalars().first()
+    if camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    camera, tenant, location = row
-    path_name = sanitize_path_name(camera.name)
+    path_name = _path_name(camera)
     mode = force_mode if force_mode in ["direct", "ffmpeg", "auto"] else camera.stream_mode
-    tenant_slug = tenant.slug if tenant else None
-    location_name = location.name if location else None
+    tenant_slug = camera.tenant.slug if camera.tenant else None
+    location_name = camera.location.name if camera.location else None
     
     # Remove existing path first
     await remove_camera_path(path_name)
@@ -649,7 +770,6 @@ async def resync_camera(camera_id: int, force_mode: str = None, db: AsyncSession
     if success and final_mode in ["direct", "ffmpeg"]:
         camera.stream_mode = final_mode
         await db.commit()
-        await db.refresh(camera)
     
     return {
         "success": success,
@@ -662,12 +782,11 @@ async def resync_camera(camera_id: int, force_mode: str = None, db: AsyncSession
 @router.get("/{camera_id}/status")
 async def get_camera_status(camera_id: int, db: AsyncSession = Depends(get_db)):
     """Get the current streaming status of a camera."""
-    result = await db.execute(select(Camera).filter(Camera.id == camera_id))
-    camera = result.scalars().first()
+    camera = await db.get(Camera, camera_id)
     if camera is None:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    path_name = sanitize_path_name(camera.name)
+    path_name = _path_name(camera)
     status = await get_path_status(path_name)
     
     return {
@@ -682,7 +801,7 @@ async def get_camera_status(camera_id: int, db: AsyncSession = Depends(get_db)):
 @router.get("/discover/network-info")
 async def get_network_info():
     """Get information about the local network that will be scanned."""
-    network_range = get_local_network_range()
+    network_range = get_cached_network_range()
     return {
         "network_range": network_range,
         "message": "This is the network range that will be scanned for cameras"
@@ -695,7 +814,9 @@ async def discover_network_cameras(
     use_port_scan: bool = Query(True, description="Use port scanning to find RTSP services"),
     network_range: Optional[str] = Query(None, description="Network range to scan (e.g., '192.168.1.0/24'). Auto-detected if not provided."),
     scan_timeout: float = Query(0.5, description="Timeout per host for port scanning (seconds)"),
-    onvif_timeout: float = Query(3.0, description="Timeout for ONVIF discovery (seconds)")
+    onvif_timeout: float = Query(3.0, description="Timeout for ONVIF discovery (seconds)"),
+    force_refresh: bool = Query(False, description="Ignore recently cached results and scan again"),
+    stream: bool = Query(False, description="Stream cameras as NDJSON as soon as they are found")
 ):
     """
     Discover cameras on the local network.
@@ -704,26 +825,56 @@ async def discover_network_cameras(
     1. **ONVIF WS-Discovery**: Finds ONVIF-compatible cameras via multicast. Fast and provides detailed device info.
     2. **Port Scanning**: Scans the network for devices with RTSP port (554) open. Slower but catches non-ONVIF cameras.
     
+    Results are cached for a few seconds per network range and method, and
+    concurrent requests share one scan.
+    
     Returns a list of discovered cameras with suggested RTSP URLs to try.
+    With stream=true, a fresh scan is run and each camera is sent as one JSON
+    line as soon as it is found (again if a second method adds to it),
+    followed by a summary line.
     """
+    methods_used = {
+        "onvif": use_onvif,
+        "port_scan": use_port_scan
+    }
+    
+    if stream:
+        async def results():
+            found = set()
+            async for camera in iter_discovered_cameras(
+                use_onvif=use_onvif,
+                use_port_scan=use_port_scan,
+                network_range=network_range,
+                scan_timeout=scan_timeout,
+                onvif_timeout=onvif_timeout
+            ):
+                found.add(camera.ip)
+                yield _discovered_camera_adapter.dump_json(camera) + b"\n"
+            yield json.dumps({
+                "count": len(found),
+                "network_scanned": network_range or get_cached_network_range(),
+                "methods_used": methods_used
+            }) + "\n"
+        
+        return StreamingResponse(results(), media_type="application/x-ndjson")
+    
     try:
-        cameras = await discover_cameras(
+        cameras = await discover_cameras_cached(
             use_onvif=use_onvif,
             use_port_scan=use_port_scan,
             network_range=network_range,
             scan_timeout=scan_timeout,
-            onvif_timeout=onvif_timeout
+            onvif_timeout=onvif_timeout,
+            force_refresh=force_refresh
         )
         
-        return {
+        result = {
             "count": len(cameras),
-            "network_scanned": network_range or get_local_network_range(),
-            "methods_used": {
-                "onvif": use_onvif,
-                "port_scan": use_port_scan
-            },
-            "cameras": [camera.to_dict() for camera in cameras]
+            "network_scanned": network_range or get_cached_network_range(),
+            "methods_used": methods_used,
+            "cameras": cameras
         }
+        return Response(content=_discovery_result_adapter.dump_json(result), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Discovery failed: {str(e)}")
 
@@ -732,8 +883,8 @@ async def discover_network_cameras(
 # ONVIF Configuration Endpoints
 # ============================================================================
 
-@router.post("/onvif/config")
-async def get_onvif_video_config(credentials: ONVIFCredentials):
+@router.post("/onvif/config", openapi_extra=_json_body_openapi(ONVIFCredentials))
+async def get_onvif_video_config(credentials: ONVIFCredentials = Depends(_json_body(ONVIFCredentials))):
     """
     Get video encoder configuration from an ONVIF camera.
     
@@ -745,7 +896,7 @@ async def get_onvif_video_config(credentials: ONVIFCredentials):
     Requires camera admin credentials for authentication.
     """
     try:
-        result = await get_camera_video_config(
+        result = await get_camera_video_config_cached(
             host=credentials.host,
             port=credentials.port,
             username=credentials.username,
@@ -759,12 +910,14 @@ async def get_onvif_video_config(credentials: ONVIFCredentials):
     
     except HTTPException:
         raise
+    except DeviceBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get ONVIF config: {str(e)}")
 
 
-@router.put("/onvif/config")
-async def update_onvif_video_config(update: VideoEncoderUpdate):
+@router.put("/onvif/config", openapi_extra=_json_body_openapi(VideoEncoderUpdate))
+async def update_onvif_video_config(update: VideoEncoderUpdate = Depends(_json_body(VideoEncoderUpdate))):
     """
     Update video encoder configuration on an ONVIF camera.
     
@@ -809,12 +962,14 @@ async def update_onvif_video_config(update: VideoEncoderUpdate):
     
     except HTTPException:
         raise
+    except DeviceBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update ONVIF config: {str(e)}")
 
 
-@router.post("/onvif/test-connection")
-async def test_onvif_connection(credentials: ONVIFCredentials):
+@router.post("/onvif/test-connection", openapi_extra=_json_body_openapi(ONVIFCredentials))
+async def test_onvif_connection(credentials: ONVIFCredentials = Depends(_json_body(ONVIFCredentials))):
     """
     Test ONVIF connection to a camera.
     
@@ -822,7 +977,7 @@ async def test_onvif_connection(credentials: ONVIFCredentials):
     Returns success status and number of profiles found.
     """
     try:
-        result = await get_camera_video_config(
+        result = await get_camera_video_config_cached(
             host=credentials.host,
             port=credentials.port,
             username=credentials.username,
@@ -3,11 +3,13 @@ Location management API routes.
 Handles CRUD operations for locations (physical sites with cameras).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, exists, insert, literal, and_, or_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
 
 from database import get_db
@@ -61,6 +63,17 @@ class LocationWithCameras(LocationResponse):
     cameras: List[dict] = []
 
 
+# Serializes the location list to JSON bytes in pydantic-core directly
+_location_list_adapter = TypeAdapter(List[LocationResponse])
+
+
+def _location_response(location: Location, cameras_count: Optional[int]) -> LocationResponse:
+    """Build a LocationResponse from the ORM row in one pydantic-core pass."""
+    response = LocationResponse.model_validate(location)
+    response.cameras_count = cameras_count or 0
+    return response
+
+
 # =============================================================================
 # Location CRUD Routes
 # =============================================================================
@@ -73,40 +86,24 @@ async def list_locations(
     db: AsyncSession = Depends(get_db)
 ):
     """List all locations, optionally filtered by tenant."""
-    query = select(Location)
+    # Count cameras per location in the same query
+    query = (
+        select(Location, func.count(Camera.id))
+        .outerjoin(Camera, Camera.location_id == Location.id)
+    )
     
     if tenant_id:
         query = query.where(Location.tenant_id == tenant_id)
     
-    query = query.offset(skip).limit(limit)
+    query = query.group_by(Location.id).offset(skip).limit(limit)
     result = await db.execute(query)
-    locations = result.scalars().all()
     
-    # Get cameras count for each location
-    response = []
-    for location in locations:
-        cameras_count = await db.scalar(
-            select(func.count(Camera.id)).where(Camera.location_id == location.id)
-        )
-        
-        location_data = LocationResponse(
-            id=location.id,
-            tenant_id=location.tenant_id,
-            name=location.name,
-            address=location.address,
-            city=location.city,
-            country=location.country,
-            latitude=location.latitude,
-            longitude=location.longitude,
-            timezone=location.timezone,
-            is_active=location.is_active,
-            created_at=location.created_at,
-            updated_at=location.updated_at,
-            cameras_count=cameras_count or 0,
-        )
-        response.append(location_data)
-    
-    return response
+    locations = [
+        _location_response(location, cameras_count)
+        for location, cameras_count in result.all()
+    ]
+    # Skip FastAPI's response_model round-trip (validate, jsonable_encoder, json.dumps)
+    return Response(content=_location_list_adapter.dump_json(locations), media_type="application/json")
 
 
 @router.post("", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
@@ -115,53 +112,50 @@ async def create_location(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new location."""
-    # Verify tenant exists
-    tenant = await db.get(Tenant, location.tenant_id)
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tenant not found"
-        )
+    # Lock the tenant row first, so concurrent creates for one tenant run one
+    # after another: under READ COMMITTED, two INSERT ... SELECTs could both
+    # count below the limit. The insert's own statement snapshot is taken
+    # after the lock, so it sees locations committed by the previous holder.
+    await db.execute(
+        select(Tenant.id).where(Tenant.id == location.tenant_id).with_for_update()
+    )
     
-    # Check location limit
-    locations_count = await db.scalar(
-        select(func.count(Location.id)).where(Location.tenant_id == location.tenant_id)
+    # Insert only if the tenant exists and is under its location limit
+    values = location.model_dump(exclude={"tenant_id"})
+    locations_count = (
+        select(func.count(Location.id))
+        .where(Location.tenant_id == Tenant.id)
+        .scalar_subquery()
     )
-    if locations_count >= tenant.max_locations:
+    source = select(
+        Tenant.id,
+        *(literal(value, Location.__table__.c[field].type) for field, value in values.items())
+    ).where(
+        Tenant.id == location.tenant_id,
+        locations_count < Tenant.max_locations
+    )
+    db_location = await db.scalar(
+        insert(Location)
+        .from_select(["tenant_id", *values], source)
+        .returning(Location)
+    )
+    
+    if db_location is None:
+        # Nothing inserted: find out why
+        tenant = await db.get(Tenant, location.tenant_id)
+        if not tenant:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tenant not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tenant has reached maximum locations limit ({tenant.max_locations})"
         )
     
-    db_location = Location(
-        tenant_id=location.tenant_id,
-        name=location.name,
-        address=location.address,
-        city=location.city,
-        country=location.country,
-        latitude=location.latitude,
-        longitude=location.longitude,
-        timezone=location.timezone,
-    )
-    db.add(db_location)
     await db.commit()
-    await db.refresh(db_location)
     
-    return LocationResponse(
-        id=db_location.id,
-        tenant_id=db_location.tenant_id,
-        name=db_location.name,
-        address=db_location.address,
-        city=db_location.city,
-        country=db_location.country,
-        latitude=db_location.latitude,
-        longitude=db_location.longitude,
-        timezone=db_location.timezone,
-        is_active=db_location.is_active,
-        created_at=db_location.created_at,
-        updated_at=db_location.updated_at,
-        cameras_count=0,
-    )
+    return _location_response(db_location, 0)
 
 
 @router.get("/{location_id}", response_model=LocationWithCameras)
@@ -170,19 +164,18 @@ async def get_location(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific location with its cameras."""
-    location = await db.get(Location, location_id)
+    result = await db.execute(
+        select(Location)
+        .options(selectinload(Location.cameras))
+        .where(Location.id == location_id)
+    )
+    location = result.scalar_one_or_none()
     if not location:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Location not found"
         )
     
-    # Get cameras
-    result = await db.execute(
-        select(Camera).where(Camera.location_id == location_id)
-    )
-    cameras = result.scalars().all()
-    
     cameras_list = [
         {
             "id": cam.id,
@@ -191,25 +184,12 @@ async def get_location(
             "is_active": cam.is_active,
             "stream_mode": cam.stream_mode,
         }
-        for cam in cameras
+        for cam in location.cameras
     ]
     
-    return LocationWithCameras(
-        id=location.id,
-        tenant_id=location.tenant_id,
-        name=location.name,
-        address=location.address,
-        city=location.city,
-        country=location.country,
-        latitude=location.latitude,
-        longitude=location.longitude,
-        timezone=location.timezone,
-        is_active=location.is_active,
-        created_at=location.created_at,
-        updated_at=location.updated_at,
-        cameras_count=len(cameras_list),
-        cameras=cameras_list,
-    )
+    response = LocationWithCameras.model_validate(_location_response(location, len(cameras_list)))
+    response.cameras = cameras_list
+    return response
 
 
 @router.patch("/{location_id}", response_model=LocationResponse)
@@ -219,12 +199,22 @@ async def update_location(
     db: AsyncSession = Depends(get_db)
 ):
     """Update a location."""
-    location = await db.get(Location, location_id)
-    if not location:
+    # Load the location together with its cameras count
+    result = await db.execute(
+        select(
+            Location,
+            select(func.count(Camera.id))
+            .where(Camera.location_id == Location.id)
+            .scalar_subquery()
+        ).where(Location.id == location_id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Location not found"
         )
+    location, cameras_count = row
     
     update_data = location_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
@@ -233,26 +223,7 @@ async def update_location(
     await db.commit()
     await db.refresh(location)
     
-    # Get cameras count
-    cameras_count = await db.scalar(
-        select(func.count(Camera.id)).where(Camera.location_id == location.id)
-    )
-    
-    return LocationResponse(
-        id=location.id,
-        tenant_id=location.tenant_id,
-        name=location.name,
-        address=location.address,
-        city=location.city,
-        country=location.country,
-        latitude=location.latitude,
-        longitude=location.longitude,
-        timezone=location.timezone,
-        is_active=location.is_active,
-        created_at=location.created_at,
-        updated_at=location.updated_at,
-        cameras_count=cameras_count or 0,
-    )
+    return _location_response(location, cameras_count)
 
 
 @router.delete("/{location_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -268,11 +239,15 @@ async def delete_location(
             detail="Location not found"
         )
     
-    # Check if location has cameras
-    cameras_count = await db.scalar(
-        select(func.count(Camera.id)).where(Camera.location_id == location_id)
+    # Check if location has cameras; EXISTS stops at the first match
+    has_cameras = await db.scalar(
+        select(exists().where(Camera.location_id == location_id))
     )
-    if cameras_count > 0:
+    if has_cameras:
+        # Only the error message needs the exact number
+        cameras_count = await db.scalar(
+            select(func.count(Camera.id)).where(Camera.location_id == location_id)
+        )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot delete location with {cameras_count} cameras. Move or delete cameras first."
@@ -299,26 +274,21 @@ async def list_location_users(
             detail="Location not found"
         )
     
-    # Get users with all_locations_access or specific access to this location
+    # Users with all_locations_access in the tenant, or specific access to
+    # this location, in one query
     result = await db.execute(
-        select(TenantUser).where(
-            TenantUser.tenant_id == location.tenant_id,
-            TenantUser.all_locations_access == True
-        )
-    )
-    all_access_users = result.scalars().all()
-    
-    # Get users with specific access
-    result = await db.execute(
-        select(TenantUser)
-        .join(user_locations)
-        .where(user_locations.c.location_id == location_id)
+        select(TenantUser).where(or_(
+            and_(
+                TenantUser.tenant_id == location.tenant_id,
+                TenantUser.all_locations_access == True
+            ),
+            exists().where(
+                user_locations.c.user_id == TenantUser.id,
+                user_locations.c.location_id == location_id
+            )
+        ))
     )
-    specific_users = result.scalars().all()
-    
-    # Combine and deduplicate
-    users_dict = {u.id: u for u in all_access_users}
-    users_dict.update({u.id: u for u in specific_users})
+    users = result.scalars().all()
     
     return [
         {
@@ -327,7 +297,7 @@ async def list_location_users(
             "all_locations_access": u.all_locations_access,
             "is_active": u.is_active,
         }
-        for u in users_dict.values()
+        for u in users
     ]
 
 
@@ -357,23 +327,17 @@ async def assign_user_to_location(
             detail="User not found in this tenant"
         )
     
-    # Check if already assigned
+    # Insert assignment; an existing one is reported by the insert itself
     result = await db.execute(
-        select(user_locations).where(
-            user_locations.c.user_id == user_id,
-            user_locations.c.location_id == location_id
-        )
+        pg_insert(user_locations)
+        .values(user_id=user_id, location_id=location_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "location_id"])
     )
-    if result.first():
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User already assigned to this location"
         )
-    
-    # Insert assignment
-    await db.execute(
-        user_locations.insert().values(user_id=user_id, location_id=location_id)
-    )
     await db.commit()
     
     return {"message": "User assigned to location successfully"}
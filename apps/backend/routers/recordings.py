@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
-from datetime import datetime, time
+from sqlalchemy import func, cast, tuple_, Time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime, time, timedelta
+import asyncio
+import time as time_module
 import os
-import io
 import zipfile
-from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from database import get_db
-from models import RecordingLog, Camera, Tenant, Location
+from models import RecordingLog, RecordingFile, Camera, Tenant, Location
 from schemas import RecordingLogResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from services.mediamtx import sanitize_name
+from services.recording_index import (
+    INDEX_INTERVAL_SECONDS,
+    RECORDINGS_BASE_PATH,
+    get_file_duration_estimate,
+    parse_recording_filename,
+    recording_indexer,
+    remove_from_index,
+)
 
 router = APIRouter(
     prefix="/api/recordings",
@@ -30,6 +41,7 @@ class RecordingSearchParams(BaseModel):
     end_time: Optional[str] = None   # HH:MM format
     page: int = 1
     page_size: int = 50
+    cursor: Optional[str] = None     # next_cursor of the previous page; overrides page
 
 
 class RecordingInfo(BaseModel):
@@ -52,26 +64,164 @@ class PaginatedRecordings(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None  # Pass as cursor to fetch the next page
+
+
+_recording_list_adapter = TypeAdapter(List[RecordingInfo])
+_cameras_with_recordings_adapter = TypeAdapter(List[Dict[str, Any]])
 
 
 class BulkDownloadRequest(BaseModel):
     recording_ids: List[str]
 
 
-def get_file_duration_estimate(file_size_bytes: int) -> int:
-    """Estimate duration based on file size (rough estimate for 1080p ~60MB/min)"""
-    mb = file_size_bytes / (1024 * 1024)
-    # Approximately 1 MB per second for typical 1080p h264
-    return int(mb)
+# Public URL under which /recordings is served (the /media static mount)
+MEDIA_URL_PREFIX = "http://localhost:8001/media/"
+
+# /cameras-with-recordings responses per tenant filter, with the index
+# generation they were built from: (expires, generation, JSON body)
+CAMERAS_WITH_RECORDINGS_CACHE_TTL = 30  # seconds
+_cameras_with_recordings_cache: Dict[Optional[int], Tuple[float, int, bytes]] = {}
+
+# Search totals per filter combination, with the index generation they were
+# counted at: (expires, generation, total)
+SEARCH_COUNT_CACHE_TTL = 60  # seconds
+SEARCH_COUNT_CACHE_MAX_ENTRIES = 1024
+_search_count_cache: Dict[tuple, Tuple[float, int, int]] = {}
+
+# Recording dates per camera folder path, with the folder mtime they were
+# listed at: (mtime_ns, trusted until, dates). Adding or deleting a file
+# changes the mtime; while the indexer's file watcher runs, it drops changed
+# folders, so entries are served without a stat until "trusted until".
+_dates_cache: Dict[str, Tuple[int, float, List[str]]] = {}
+
+
+def _invalidate_dates_cache(paths: Set[str]):
+    for path in paths:
+        _dates_cache.pop(path, None)
+
+
+recording_indexer.add_change_listener(_invalidate_dates_cache)
+
+
+def invalidate_camera_caches():
+    """
+    Drop responses that embed camera details (name, tenant, location). Call
+    after a camera is updated or deleted; index changes are caught by the
+    indexer generation instead.
+    """
+    _cameras_with_recordings_cache.clear()
+    _search_count_cache.clear()
+
+# Zip downloads are sent in chunks of about this size, with at most
+# ZIP_STREAM_QUEUE_CHUNKS built ahead of the client
+ZIP_STREAM_CHUNK_SIZE = 1024 * 1024
+ZIP_STREAM_QUEUE_CHUNKS = 8
+
+# Zip archives are built in their own small pool, so a few long downloads
+# can't take every thread of the default executor (deletes, the indexer)
+ZIP_BUILD_WORKERS = 4
+_zip_executor = ThreadPoolExecutor(max_workers=ZIP_BUILD_WORKERS, thread_name_prefix="zip-build")
+
+
+class _RecordingFileResponse(FileResponse):
+    """
+    FileResponse that reads recordings in 1 MiB chunks. Uvicorn has no
+    zero-copy send, so each chunk is a thread round trip; Starlette's 64 KiB
+    default means 16x as many for multi-hundred-MB MP4s.
+    """
+    chunk_size = 1024 * 1024
 
 
-def parse_recording_filename(filename: str) -> Optional[datetime]:
-    """Parse MediaMTX recording filename format: YYYY-MM-DD_HH-MM-SS.mp4"""
+class _ZipStream:
+    """
+    Write-only file object for ZipFile that hands the archive, chunk by chunk,
+    to an async consumer. ZipFile runs in a worker thread and blocks when the
+    consumer falls behind.
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=ZIP_STREAM_QUEUE_CHUNKS)
+        self.buffer = bytearray()
+        self.cancelled = False
+    
+    def _put(self, chunk: Optional[bytes]):
+        asyncio.run_coroutine_threadsafe(self.queue.put(chunk), self.loop).result()
+    
+    def write(self, data) -> int:
+        if self.cancelled:
+            raise OSError("Download cancelled")
+        self.buffer += data
+        if len(self.buffer) >= ZIP_STREAM_CHUNK_SIZE:
+            self._put(bytes(self.buffer))
+            self.buffer.clear()
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def finish(self):
+        """Send what's left and signal the end of the archive."""
+        if self.cancelled:
+            return
+        if self.buffer:
+            self._put(bytes(self.buffer))
+            self.buffer.clear()
+        self._put(None)
+
+
+async def stream_zip(files: List[Tuple[str, str]], compression: int = zipfile.ZIP_STORED):
+    """
+    Build a zip of `files` ((path, archive name) pairs) in a worker thread,
+    yielding its bytes as they are produced instead of buffering the archive.
+    Files that disappear before they are added are skipped.
+    """
+    stream = _ZipStream(asyncio.get_running_loop())
+    
+    def build():
+        try:
+            with zipfile.ZipFile(stream, "w", compression) as zip_file:
+                for file_path, archive_name in files:
+                    try:
+                        zip_file.write(file_path, archive_name)
+                    except FileNotFoundError:
+                        continue
+        finally:
+            stream.finish()
+    
+    producer = asyncio.get_running_loop().run_in_executor(_zip_executor, build)
     try:
-        date_str = filename.replace(".mp4", "")
-        return datetime.strptime(date_str, "%Y-%m-%d_%H-%M-%S")
-    except ValueError:
-        return None
+        while (chunk := await stream.queue.get()) is not None:
+            yield chunk
+        await producer
+    finally:
+        # Client went away: stop the worker and unblock it if it's waiting
+        stream.cancelled = True
+        while not stream.queue.empty():
+            stream.queue.get_nowait()
+        # The worker now fails with "Download cancelled"; nothing to report
+        producer.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+
+def _legacy_folder_name(camera: Camera) -> str:
+    """
+    Legacy recording folder of a camera. Rows created before the
+    name_sanitized column existed fall back to sanitizing the name.
+    """
+    return camera.name_sanitized or sanitize_name(camera.name)
+
+
+def _recording_folder_exists(folder: str) -> bool:
+    """
+    Whether a camera folder exists under /recordings. Answered from the
+    folders the recording indexer last saw, so lookups cost no syscalls;
+    before its first sync, the disk is checked.
+    """
+    known = recording_indexer.has_folder(folder)
+    if known is None:
+        return os.path.isdir(RECORDINGS_BASE_PATH + "/" + folder)
+    return known
 
 
 def get_camera_recording_path(camera: Camera) -> str:
@@ -83,40 +233,21 @@ def get_camera_recording_path(camera: Camera) -> str:
     
     Returns the path that exists, preferring new structure.
     """
-    base_path = "/recordings"
-    
-    # New structure with tenant/location
+    new_folder = None
     if camera.tenant_id and camera.location_id:
-        new_path = os.path.join(
-            base_path, 
-            f"tenant_{camera.tenant_id}",
-            f"location_{camera.location_id}",
-            f"camera_{camera.id}"
-        )
-        if os.path.exists(new_path):
-            return new_path
+        new_folder = f"tenant_{camera.tenant_id}/location_{camera.location_id}/camera_{camera.id}"
     
-    # Try camera ID based path
-    camera_id_path = os.path.join(base_path, f"camera_{camera.id}")
-    if os.path.exists(camera_id_path):
-        return camera_id_path
+    candidates = [
+        new_folder,  # New structure with tenant/location
+        f"camera_{camera.id}",  # Camera ID based path
+        _legacy_folder_name(camera),  # Legacy: camera name based path
+    ]
+    for folder in candidates:
+        if folder and _recording_folder_exists(folder):
+            return RECORDINGS_BASE_PATH + "/" + folder
     
-    # Legacy: camera name based path
-    legacy_path = os.path.join(base_path, sanitize_name(camera.name))
-    if os.path.exists(legacy_path):
-        return legacy_path
-    
-    # Return new path as default for creation
-    if camera.tenant_id and camera.location_id:
-        return os.path.join(
-            base_path,
-            f"tenant_{camera.tenant_id}",
-            f"location_{camera.location_id}",
-            f"camera_{camera.id}"
-        )
-    
-    # Fallback to camera name
-    return os.path.join(base_path, sanitize_name(camera.name))
+    # Return new path as default for creation, else fall back to camera name
+    return RECORDINGS_BASE_PATH + "/" + (new_folder or _legacy_folder_name(camera))
 
 
 def ensure_recording_directory(camera: Camera) -> str:
@@ -131,89 +262,67 @@ async def get_cameras_with_recordings(
     tenant_id: Optional[int] = Query(None, description="Filter by tenant ID"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of cameras that have recordings available."""
-    base_path = "/recordings"
+    """
+    Get list of cameras that have recordings available.
+    Counts come from the recording_files index, one row per camera folder.
+    Responses are cached for CAMERAS_WITH_RECORDINGS_CACHE_TTL seconds, or
+    until recordings are added to or removed from the index.
+    """
+    headers = {"Cache-Control": f"private, max-age={CAMERAS_WITH_RECORDINGS_CACHE_TTL}"}
+    
+    cached = _cameras_with_recordings_cache.get(tenant_id)
+    if cached is not None:
+        expires, generation, content = cached
+        if time_module.monotonic() < expires and generation == recording_indexer.generation:
+            return Response(content=content, media_type="application/json", headers=headers)
+    
+    generation = recording_indexer.generation
     cameras_with_recordings = []
     
-    # Get all cameras from database with optional tenant filter
-    query = select(Camera)
+    query = (
+        select(RecordingFile.folder_name, Camera, func.count(RecordingFile.id))
+        .join(Camera, RecordingFile.camera_id == Camera.id)
+        .group_by(RecordingFile.folder_name, Camera.id)
+        .order_by(RecordingFile.folder_name)
+    )
     if tenant_id:
         query = query.filter(Camera.tenant_id == tenant_id)
     result = await db.execute(query)
-    cameras = result.scalars().all()
     
-    # Build lookup for both new and legacy structures
-    camera_by_name = {sanitize_name(c.name): c for c in cameras}
-    camera_by_id = {c.id: c for c in cameras}
+    # Same precedence as get_camera_recording_path: tenant_X/location_X/camera_X
+    # folders are always listed; a top-level camera_X folder only for cameras
+    # without one, and a legacy /recordings/{camera_name} folder only for
+    # cameras with neither
+    def folder_rank(row) -> int:
+        if row[0].startswith("tenant_"):
+            return 0
+        return 1 if row[0].startswith("camera_") else 2
     
+    folders = sorted(result.all(), key=folder_rank)
     processed_cameras = set()
     
-    # Check new structure: /recordings/tenant_X/location_X/camera_X
-    if os.path.exists(base_path):
-        for tenant_folder in os.listdir(base_path):
-            if tenant_folder.startswith("tenant_"):
-                tenant_path = os.path.join(base_path, tenant_folder)
-                if not os.path.isdir(tenant_path):
-                    continue
-                    
-                for location_folder in os.listdir(tenant_path):
-                    if location_folder.startswith("location_"):
-                        location_path = os.path.join(tenant_path, location_folder)
-                        if not os.path.isdir(location_path):
-                            continue
-                            
-                        for camera_folder in os.listdir(location_path):
-                            if camera_folder.startswith("camera_"):
-                                camera_path = os.path.join(location_path, camera_folder)
-                                if not os.path.isdir(camera_path):
-                                    continue
-                                
-                                # Extract camera ID
-                                try:
-                                    cam_id = int(camera_folder.replace("camera_", ""))
-                                except ValueError:
-                                    continue
-                                
-                                camera = camera_by_id.get(cam_id)
-                                if not camera:
-                                    continue
-                                
-                                recordings = glob(os.path.join(camera_path, "*.mp4"))
-                                if recordings:
-                                    processed_cameras.add(camera.id)
-                                    cameras_with_recordings.append({
-                                        "folder_name": f"{tenant_folder}/{location_folder}/{camera_folder}",
-                                        "camera_id": camera.id,
-                                        "camera_name": camera.name,
-                                        "tenant_id": camera.tenant_id,
-                                        "location_id": camera.location_id,
-                                        "recording_count": len(recordings)
-                                    })
-        
-        # Check legacy structure: /recordings/{camera_name}
-        for folder_name in os.listdir(base_path):
-            folder_path = os.path.join(base_path, folder_name)
-            if os.path.isdir(folder_path) and not folder_name.startswith(("tenant_", "camera_")):
-                # Legacy folder with camera name
-                camera = camera_by_name.get(folder_name)
-                if camera and camera.id not in processed_cameras:
-                    recordings = glob(os.path.join(folder_path, "*.mp4"))
-                    if recordings:
-                        cameras_with_recordings.append({
-                            "folder_name": folder_name,
-                            "camera_id": camera.id,
-                            "camera_name": camera.name,
-                            "tenant_id": camera.tenant_id,
-                            "location_id": camera.location_id,
-                            "recording_count": len(recordings)
-                        })
-    
-    return cameras_with_recordings
-
-
-def sanitize_name(name: str) -> str:
-    """Convert camera name to folder-safe format (matches MediaMTX path names)."""
-    return name.lower().replace(" ", "_").replace("-", "_")
+    for row in folders:
+        folder_name, camera, recording_count = row
+        if folder_rank(row) > 0 and camera.id in processed_cameras:
+            continue
+        processed_cameras.add(camera.id)
+        cameras_with_recordings.append({
+            "folder_name": folder_name,
+            "camera_id": camera.id,
+            "camera_name": camera.name,
+            "tenant_id": camera.tenant_id,
+            "location_id": camera.location_id,
+            "recording_count": recording_count
+        })
+    
+    # Cache the serialized body so cache hits skip JSON encoding entirely
+    content = _cameras_with_recordings_adapter.dump_json(cameras_with_recordings)
+    _cameras_with_recordings_cache[tenant_id] = (
+        time_module.monotonic() + CAMERAS_WITH_RECORDINGS_CACHE_TTL,
+        generation,
+        content
+    )
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 def parse_recording_id(recording_id: str) -> tuple[str, str]:
@@ -221,20 +330,28 @@ def parse_recording_id(recording_id: str) -> tuple[str, str]:
     Parse recording ID to extract folder_path and filename.
     ID format: {folder_path}::{filename}
     folder_path can contain subdirectories like tenant_1/location_1/camera_1
-    """
-    if "::" not in recording_id:
-        raise ValueError("Invalid recording ID format. Expected 'folder_path::filename'")
     
-    parts = recording_id.split("::", 1)
-    return parts[0], parts[1]
+    Folder segments can't be empty, "." or "..", or contain backslashes, so
+    IDs can't point outside /recordings; checked before any filesystem call.
+    """
+    folder_path, sep, filename = recording_id.partition("::")
+    if (
+        not sep
+        or parse_recording_filename(filename) is None
+        or "\\" in folder_path
+        or "\x00" in folder_path
+        or any(segment in ("", ".", "..") for segment in folder_path.split("/"))
+    ):
+        raise ValueError("Invalid recording ID format. Expected 'folder_path::YYYY-MM-DD_HH-MM-SS.mp4'")
+    return folder_path, filename
 
 
 def get_recording_file_path(folder_path: str, filename: str) -> str:
-    """Get the full file path for a recording."""
-    base_path = "/recordings"
-    # Normalize path separators
-    normalized_folder = folder_path.replace("/", os.sep).replace("\\", os.sep)
-    return os.path.join(base_path, normalized_folder, filename)
+    """
+    Get the full file path for a recording. folder_path and filename come from
+    parse_recording_id, so they are already '/'-separated and validated.
+    """
+    return RECORDINGS_BASE_PATH + "/" + folder_path + "/" + filename
 
 
 
@@ -258,9 +375,9 @@ async def get_recordings(
         page_size=limit
     )
     
-    # Call the search function to reuse logic
-    result = await search_recordings(params, db)
-    return result.recordings
+    # Reuse the search query, serializing only the recordings list
+    result = await _search_recordings(params, db)
+    return Response(content=_recording_list_adapter.dump_json(result.recordings), media_type="application/json")
 
 
 @router.post("/search", response_model=PaginatedRecordings)
@@ -279,21 +396,38 @@ async def search_recordings(
     - end_time: Filter recordings before this time HH:MM (optional)
     - page: Page number (1-indexed)
     - page_size: Number of results per page
+
+    Recordings come from the recording_files index, which the recording
+    indexer keeps in sync with /recordings.
     """
-    base_path = "/recordings"
-    all_results: List[RecordingInfo] = []
-    
-    # Build camera query with filters
-    query = select(Camera)
+    result = await _search_recordings(params, db)
+    return Response(content=result.model_dump_json(), media_type="application/json")
+
+
+def _parse_search_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a search cursor: {start_time ISO}|{recording_files.id}"""
+    try:
+        start_time, recording_id = cursor.split("|")
+        return datetime.fromisoformat(start_time), int(recording_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _search_recordings(params: RecordingSearchParams, db: AsyncSession) -> PaginatedRecordings:
+    """
+    Run the recording search and build one page of results.
+
+    Rows come straight from the index, so the page is assembled with
+    model_construct instead of re-validating every field of every row.
+    """
+    # Build query with filters
+    query = select(RecordingFile, Camera).join(Camera, RecordingFile.camera_id == Camera.id)
     if params.tenant_id:
         query = query.filter(Camera.tenant_id == params.tenant_id)
     if params.location_id:
         query = query.filter(Camera.location_id == params.location_id)
     if params.camera_id:
-        query = query.filter(Camera.id == params.camera_id)
-    
-    result = await db.execute(query)
-    cameras = result.scalars().all()
+        query = query.filter(RecordingFile.camera_id == params.camera_id)
     
     # Parse date filter
     filter_date = None
@@ -319,74 +453,83 @@ async def search_recordings(
         except (ValueError, IndexError):
             pass
     
-    # Search recordings for each camera
-    for camera in cameras:
-        recording_path = get_camera_recording_path(camera)
-        
-        if not os.path.exists(recording_path):
-            continue
-        
-        for filepath in glob(os.path.join(recording_path, "*.mp4")):
-            filename = os.path.basename(filepath)
-            recording_time = parse_recording_filename(filename)
-            
-            if not recording_time:
-                continue
-            
-            # Apply date filter
-            if filter_date and recording_time.date() != filter_date:
-                continue
-            
-            # Apply time filters
-            rec_time = recording_time.time()
-            if filter_start_time and rec_time < filter_start_time:
-                continue
-            if filter_end_time and rec_time > filter_end_time:
-                continue
-            
-            # Get file info
-            try:
-                file_stat = os.stat(filepath)
-                file_size_mb = file_stat.st_size / (1024 * 1024)
-                duration = get_file_duration_estimate(file_stat.st_size)
-            except OSError:
-                file_size_mb = 0
-                duration = 0
-            
-            # Get relative path from base for folder_name
-            relative_path = os.path.relpath(recording_path, base_path)
-            
-            # Create result entry
-            all_results.append(RecordingInfo(
-                id=f"{relative_path}::{filename}",
-                camera_id=camera.id,
-                camera_name=camera.name,
-                tenant_id=camera.tenant_id,
-                location_id=camera.location_id,
-                folder_name=relative_path,
-                filename=filename,
-                start_time=recording_time,
-                duration_seconds=duration,
-                file_size_mb=round(file_size_mb, 2),
-                file_path=f"http://localhost:8001/media/{relative_path.replace(os.sep, '/')}/{filename}"
-            ))
-    
-    # Sort by start_time descending (newest first)
-    all_results.sort(key=lambda x: x.start_time, reverse=True)
-    
-    # Paginate results
-    total = len(all_results)
+    if filter_date:
+        # Range on the indexed column for the day, narrowed by the time filters
+        day_start = datetime.combine(filter_date, filter_start_time or time.min)
+        query = query.filter(RecordingFile.start_time >= day_start)
+        if filter_end_time:
+            query = query.filter(RecordingFile.start_time <= datetime.combine(filter_date, filter_end_time))
+        else:
+            next_day = datetime.combine(filter_date + timedelta(days=1), time.min)
+            query = query.filter(RecordingFile.start_time < next_day)
+    else:
+        # Time of day on any date
+        if filter_start_time:
+            query = query.filter(cast(RecordingFile.start_time, Time) >= filter_start_time)
+        if filter_end_time:
+            query = query.filter(cast(RecordingFile.start_time, Time) <= filter_end_time)
+    
+    # Paging through the same filters reuses the total
+    count_key = (
+        params.camera_id, params.tenant_id, params.location_id,
+        filter_date, filter_start_time, filter_end_time
+    )
+    cached = _search_count_cache.get(count_key)
+    if cached is not None and time_module.monotonic() < cached[0] and cached[1] == recording_indexer.generation:
+        total = cached[2]
+    else:
+        generation = recording_indexer.generation
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        if len(_search_count_cache) >= SEARCH_COUNT_CACHE_MAX_ENTRIES:
+            _search_count_cache.clear()
+        _search_count_cache[count_key] = (
+            time_module.monotonic() + SEARCH_COUNT_CACHE_TTL, generation, total
+        )
+    
+    # Newest first, one page. With a cursor, seek past the last row of the
+    # previous page on the (start_time, id) index instead of using OFFSET.
+    query = query.order_by(RecordingFile.start_time.desc(), RecordingFile.id.desc()).limit(params.page_size)
+    if params.cursor:
+        cursor_time, cursor_id = _parse_search_cursor(params.cursor)
+        query = query.filter(tuple_(RecordingFile.start_time, RecordingFile.id) < (cursor_time, cursor_id))
+    else:
+        query = query.offset((params.page - 1) * params.page_size)
+    rows = (await db.execute(query)).all()
+    
+    paginated_results = []
+    for recording, camera in rows:
+        file_size_mb = recording.file_size / (1024 * 1024)
+        paginated_results.append(RecordingInfo.model_construct(
+            id=recording.folder_name + "::" + recording.filename,
+            camera_id=camera.id,
+            camera_name=camera.name,
+            tenant_id=camera.tenant_id,
+            location_id=camera.location_id,
+            folder_name=recording.folder_name,
+            filename=recording.filename,
+            start_time=recording.start_time,
+            duration_seconds=(
+                recording.duration_seconds if recording.duration_seconds is not None
+                else get_file_duration_estimate(recording.file_size)
+            ),
+            file_size_mb=round(file_size_mb, 2),
+            file_path=MEDIA_URL_PREFIX + recording.folder_name + "/" + recording.filename
+        ))
+    
     total_pages = (total + params.page_size - 1) // params.page_size
-    start_idx = (params.page - 1) * params.page_size
-    end_idx = start_idx + params.page_size
-    paginated_results = all_results[start_idx:end_idx]
     
-    return PaginatedRecordings(
+    next_cursor = None
+    if len(rows) == params.page_size:
+        last = rows[-1][0]
+        next_cursor = f"{last.start_time.isoformat()}|{last.id}"
+    
+    return PaginatedRecordings.model_construct(
         recordings=paginated_results,
         total=total,
         page=params.page,
         page_size=params.page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -400,30 +543,81 @@ async def get_available_dates(camera_id: int, db: AsyncSession = Depends(get_db)
         raise HTTPException(status_code=404, detail="Camera not found")
     
     folder_path = get_camera_recording_path(camera)
+    cached = _dates_cache.get(folder_path)
+    if cached is not None and recording_indexer.watching and time_module.monotonic() < cached[1]:
+        return cached[2]
+    return await asyncio.to_thread(_list_recording_dates, folder_path)
+
+
+def _list_recording_dates(folder_path: str) -> List[str]:
+    """
+    List the dates with recordings in a folder, newest first.
+    The folder is only re-listed when its mtime changes. Blocking: run it in a thread.
+    """
+    try:
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+    except FileNotFoundError:
+        _dates_cache.pop(folder_path, None)
+        return []
+    
+    cached = _dates_cache.get(folder_path)
+    if cached is not None and cached[0] == mtime_ns:
+        _dates_cache[folder_path] = (mtime_ns, time_module.monotonic() + INDEX_INTERVAL_SECONDS, cached[2])
+        return cached[2]
     
     dates = set()
-    if os.path.exists(folder_path):
-        for filename in os.listdir(folder_path):
-            if filename.endswith(".mp4"):
-                recording_time = parse_recording_filename(filename)
-                if recording_time:
-                    dates.add(recording_time.date().isoformat())
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            # Filenames start with the date (YYYY-MM-DD_...): once a day is
+            # known, its other segments don't need parsing
+            if entry.name[:10] in dates or not entry.name.endswith(".mp4"):
+                continue
+            recording_time = parse_recording_filename(entry.name)
+            if recording_time:
+                dates.add(entry.name[:10])
     
-    return sorted(list(dates), reverse=True)
+    sorted_dates = sorted(dates, reverse=True)
+    _dates_cache[folder_path] = (mtime_ns, time_module.monotonic() + INDEX_INTERVAL_SECONDS, sorted_dates)
+    return sorted_dates
+
+
+def _delete_recording_file(folder_path: str, filename: str) -> None:
+    """
+    Delete the file of a recording. Blocking: run it in a thread.
+    
+    Raises:
+        FileNotFoundError: If the recording doesn't exist
+    """
+    file_path = get_recording_file_path(folder_path, filename)
+    os.remove(file_path)
+    _dates_cache.pop(os.path.dirname(file_path), None)
+
+
+def _delete_folder_recordings(folder_path: str, filenames: List[str]) -> List[Optional[Exception]]:
+    """
+    Delete several recordings of one folder, one after another.
+    Returns, per file, None or the error it failed with. Blocking: run it in a thread.
+    """
+    results = []
+    for filename in filenames:
+        try:
+            _delete_recording_file(folder_path, filename)
+            results.append(None)
+        except Exception as e:
+            results.append(e)
+    return results
 
 
 @router.delete("/{recording_id:path}")
-async def delete_recording(recording_id: str):
+async def delete_recording(recording_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a recording file. ID format: folder_path::filename"""
     try:
         folder_path, filename = parse_recording_id(recording_id)
-        file_path = get_recording_file_path(folder_path, filename)
-        
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail=f"Recording not found: {file_path}")
-        
-        os.remove(file_path)
+        await asyncio.to_thread(_delete_recording_file, folder_path, filename)
+        await remove_from_index(db, [(folder_path, filename)])
         return {"success": True, "deleted": recording_id}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Recording not found: {e.filename}")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -431,25 +625,43 @@ async def delete_recording(recording_id: str):
 
 
 @router.post("/delete-bulk")
-async def delete_recordings_bulk(recording_ids: List[str]):
+async def delete_recordings_bulk(recording_ids: List[str], db: AsyncSession = Depends(get_db)):
     """Delete multiple recordings at once. IDs format: folder_path::filename"""
     deleted = []
+    deleted_files = []
     errors = []
     
+    # Reject malformed IDs up front, without touching the filesystem
+    valid = []
     for recording_id in recording_ids:
         try:
-            folder_path, filename = parse_recording_id(recording_id)
-            file_path = get_recording_file_path(folder_path, filename)
-            
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                deleted.append(recording_id)
-            else:
-                errors.append({"id": recording_id, "error": "File not found"})
+            valid.append((recording_id, parse_recording_id(recording_id)))
         except ValueError as e:
             errors.append({"id": recording_id, "error": str(e)})
-        except Exception as e:
-            errors.append({"id": recording_id, "error": str(e)})
+    
+    # Unlinks in one directory serialize on its lock anyway, so use one
+    # worker thread per folder, with the folders deleted in parallel
+    by_folder: Dict[str, List[Tuple[str, str]]] = {}  # folder -> [(ID, filename)]
+    for recording_id, (folder_path, filename) in valid:
+        by_folder.setdefault(folder_path, []).append((recording_id, filename))
+    
+    folder_results = await asyncio.gather(*(
+        asyncio.to_thread(_delete_folder_recordings, folder_path, [filename for _, filename in items])
+        for folder_path, items in by_folder.items()
+    ))
+    
+    for (folder_path, items), results in zip(by_folder.items(), folder_results):
+        for (recording_id, filename), result in zip(items, results):
+            if isinstance(result, FileNotFoundError):
+                errors.append({"id": recording_id, "error": "File not found"})
+            elif result is not None:
+                errors.append({"id": recording_id, "error": str(result)})
+            else:
+                deleted.append(recording_id)
+                deleted_files.append((folder_path, filename))
+    
+    if deleted_files:
+        await remove_from_index(db, deleted_files)
     
     return {
         "deleted_count": len(deleted),
@@ -459,32 +671,42 @@ async def delete_recordings_bulk(recording_ids: List[str]):
 
 
 @router.get("/download/{folder_path:path}")
-async def download_recording(folder_path: str):
-    """Download a single recording file as compressed zip. Path includes filename."""
+async def download_recording(
+    folder_path: str,
+    compress: bool = Query(False, description="Wrap the recording in a zip archive")
+):
+    """
+    Download a single recording file. Path includes filename.
+    The MP4 is sent as is, in 1 MiB chunks, unless compress=true.
+    """
     # folder_path is something like "tenant_1/location_1/camera_1/filename.mp4"
     # or legacy "camera_name/filename.mp4"
     
     # Split the path to get folder and filename
     parts = folder_path.rsplit("/", 1)
-    if len(parts) != 2 or not parts[1].endswith(".mp4"):
+    if len(parts) != 2:
         raise HTTPException(status_code=400, detail="Invalid path format")
     
-    folder, filename = parts
+    # Same rules as recording IDs, so the path can't leave /recordings
+    try:
+        folder, filename = parse_recording_id(parts[0] + "::" + parts[1])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid path format")
     file_path = get_recording_file_path(folder, filename)
     
-    if not os.path.exists(file_path):
+    # Stat off the event loop; FileResponse reuses the result for its headers
+    try:
+        stat_result = await asyncio.to_thread(os.stat, file_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Recording not found")
     
-    # Create zip in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.write(file_path, filename)
+    if not compress:
+        return _RecordingFileResponse(file_path, filename=filename, media_type="video/mp4", stat_result=stat_result)
     
-    zip_buffer.seek(0)
     zip_filename = filename.replace(".mp4", ".zip")
     
     return StreamingResponse(
-        zip_buffer,
+        stream_zip([(file_path, filename)]),
         media_type="application/zip",
         headers={
             "Content-Disposition": f'attachment; filename="{zip_filename}"'
@@ -494,34 +716,27 @@ async def download_recording(folder_path: str):
 
 @router.post("/download-bulk")
 async def download_recordings_bulk(request: BulkDownloadRequest):
-    """Download multiple recordings as a single compressed zip file."""
+    """Download multiple recordings as a single zip file."""
     if not request.recording_ids:
         raise HTTPException(status_code=400, detail="No recordings specified")
     
-    # Create zip in memory
-    zip_buffer = io.BytesIO()
-    
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for recording_id in request.recording_ids:
-            try:
-                folder_path, filename = parse_recording_id(recording_id)
-                file_path = get_recording_file_path(folder_path, filename)
-                
-                if os.path.exists(file_path):
-                    # Add to zip with folder structure
-                    archive_name = f"{folder_path.replace(os.sep, '/')}/{filename}"
-                    zip_file.write(file_path, archive_name)
-            except ValueError:
-                continue  # Skip invalid IDs
-    
-    zip_buffer.seek(0)
+    # No existence checks here: stream_zip skips missing files in its
+    # worker thread, so the event loop makes no syscalls per recording
+    files = []
+    for recording_id in request.recording_ids:
+        try:
+            folder_path, filename = parse_recording_id(recording_id)
+        except ValueError:
+            continue  # Skip invalid IDs
+        # Add to zip with folder structure
+        files.append((get_recording_file_path(folder_path, filename), folder_path + "/" + filename))
     
     # Generate filename with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     zip_filename = f"recordings_{timestamp}.zip"
     
     return StreamingResponse(
-        zip_buffer,
+        stream_zip(files),
         media_type="application/zip",
         headers={
             "Content-Disposition": f'attachment; filename="{zip_filename}"'
@@ -8,9 +8,10 @@ Supports multiple storage types: local, NAS (SMB/NFS), USB, and cloud (S3/Azure/
 import os
 import shutil
 import json
+import time
+import asyncio
 from datetime import datetime
-from typing import List, Optional
-from glob import glob
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -41,46 +42,116 @@ router = APIRouter(
 )
 
 
+# Recording stats per camera folder path: (folder mtime_ns, expires, stats).
+# New or deleted files change the mtime; the TTL catches a growing newest file.
+FOLDER_STATS_CACHE_TTL = 30  # seconds
+_folder_stats_cache: Dict[str, Tuple[int, float, Tuple[int, Optional[float], Optional[float]]]] = {}
+
+# Disk usage per mount path: (expires, (total, used, free)). Dashboards poll
+# every volume; statvfs on a network mount can block for a while.
+DISK_USAGE_CACHE_TTL = 5  # seconds
+_disk_usage_cache: Dict[str, Tuple[float, Tuple[int, int, int]]] = {}
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
 def get_disk_usage(path: str) -> tuple[int, int, int]:
-    """Get disk usage for a path. Returns (total, used, free) in bytes."""
+    """
+    Get disk usage for a path. Returns (total, used, free) in bytes.
+    Cached for DISK_USAGE_CACHE_TTL seconds per path.
+    """
+    now = time.monotonic()
+    cached = _disk_usage_cache.get(path)
+    if cached is not None and now < cached[0]:
+        return cached[1]
     try:
         if os.path.exists(path):
             usage = shutil.disk_usage(path)
+            _disk_usage_cache[path] = (now + DISK_USAGE_CACHE_TTL, (usage.total, usage.used, usage.free))
             return usage.total, usage.used, usage.free
     except Exception as e:
         print(f"Error getting disk usage for {path}: {e}")
     return 0, 0, 0
 
 
+def _read_volume_usage(mount_path: str) -> Optional[Tuple[int, int, int, int]]:
+    """(total, used, free, recording count) of a mounted volume, or None if it isn't accessible."""
+    if not os.path.exists(mount_path):
+        return None
+    total, used, free = get_disk_usage(mount_path)
+    count, _, _ = count_recordings_in_path(mount_path)
+    return total, used, free, count
+
+
+def _scan_camera_folder(path: str) -> tuple[int, Optional[float], Optional[float]]:
+    """Count the recordings of one camera folder. Returns (count, oldest mtime, newest mtime)."""
+    count = 0
+    oldest_mtime = newest_mtime = None
+    
+    # scandir hands back d_type with each entry, so only the .mp4 files
+    # need a stat call
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".mp4") or entry.name.startswith("."):
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            count += 1
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            if oldest_mtime is None or mtime < oldest_mtime:
+                oldest_mtime = mtime
+            if newest_mtime is None or mtime > newest_mtime:
+                newest_mtime = mtime
+    
+    return count, oldest_mtime, newest_mtime
+
+
 def count_recordings_in_path(path: str) -> tuple[int, Optional[datetime], Optional[datetime]]:
-    """Count recordings and find oldest/newest. Returns (count, oldest, newest)."""
-    if not os.path.exists(path):
-        return 0, None, None
-    
-    recordings = []
-    for camera_dir in glob(os.path.join(path, "*")):
-        if os.path.isdir(camera_dir):
-            recordings.extend(glob(os.path.join(camera_dir, "*.mp4")))
+    """
+    Count recordings and find oldest/newest. Returns (count, oldest, newest).
+    Camera folders are only rescanned when their mtime changes or their
+    cached stats are older than FOLDER_STATS_CACHE_TTL.
+    """
+    count = 0
+    oldest_mtime = newest_mtime = None
+    now = time.monotonic()
     
-    if not recordings:
+    try:
+        with os.scandir(path) as camera_dirs:
+            for camera_dir in camera_dirs:
+                if camera_dir.name.startswith(".") or not camera_dir.is_dir():
+                    continue
+                try:
+                    mtime_ns = camera_dir.stat().st_mtime_ns
+                    cached = _folder_stats_cache.get(camera_dir.path)
+                    if cached is not None and cached[0] == mtime_ns and now < cached[1]:
+                        folder_stats = cached[2]
+                    else:
+                        folder_stats = _scan_camera_folder(camera_dir.path)
+                        _folder_stats_cache[camera_dir.path] = (
+                            mtime_ns, now + FOLDER_STATS_CACHE_TTL, folder_stats
+                        )
+                except OSError:
+                    _folder_stats_cache.pop(camera_dir.path, None)
+                    continue
+                
+                folder_count, folder_oldest, folder_newest = folder_stats
+                count += folder_count
+                if folder_oldest is not None and (oldest_mtime is None or folder_oldest < oldest_mtime):
+                    oldest_mtime = folder_oldest
+                if folder_newest is not None and (newest_mtime is None or folder_newest > newest_mtime):
+                    newest_mtime = folder_newest
+    except OSError:
         return 0, None, None
     
-    # Get modification times
-    times = []
-    for rec in recordings:
-        try:
-            mtime = os.path.getmtime(rec)
-            times.append(datetime.fromtimestamp(mtime))
-        except:
-            pass
-    
-    if times:
-        return len(recordings), min(times), max(times)
-    return len(recordings), None, None
+    if oldest_mtime is None:
+        return count, None, None
+    return count, datetime.fromtimestamp(oldest_mtime), datetime.fromtimestamp(newest_mtime)
 
 
 def get_storage_stats(mount_path: str) -> StorageStats:
@@ -145,11 +216,18 @@ async def get_storage_overview(db: AsyncSession = Depends(get_db)):
     total_recordings = 0
     primary_id = None
     
+    # Read all mounts at once rather than one slow mount after another
+    mounted = [vol for vol in volumes if vol.mount_path]
+    usages = await asyncio.gather(*(
+        asyncio.to_thread(_read_volume_usage, vol.mount_path) for vol in mounted
+    ))
+    usage_by_volume = {vol.id: usage for vol, usage in zip(mounted, usages)}
+    
     volume_responses = []
     for vol in volumes:
-        if vol.mount_path and os.path.exists(vol.mount_path):
-            t, u, f = get_disk_usage(vol.mount_path)
-            count, _, _ = count_recordings_in_path(vol.mount_path)
+        usage = usage_by_volume.get(vol.id)
+        if usage is not None:
+            t, u, f, count = usage
             total_storage += t
             total_used += u
             total_free += f
@@ -351,6 +429,7 @@ async def check_storage_volume(
         return {"status": "error", "message": "No mount path configured"}
     
     if os.path.exists(path):
+        _disk_usage_cache.pop(path, None)  # An explicit check reads the disk
         total, used, free = get_disk_usage(path)
         count, oldest, newest = count_recordings_in_path(path)
         
@@ -608,6 +687,7 @@ async def trigger_cleanup(
     )
     
     # Update volume stats
+    _disk_usage_cache.pop(volume.mount_path, None)  # Space was just freed
     total, used, free = get_disk_usage(volume.mount_path)
     volume.total_bytes = total
     volume.used_bytes = used
@@ -0,0 +1,42 @@
+"""
+Script to add the name_sanitized column to the cameras table and backfill it.
+Run this once on databases created before cameras.name_sanitized existed.
+"""
+import asyncio
+from sqlalchemy import text
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from services.mediamtx import sanitize_name
+
+async def add_column():
+    async with engine.begin() as conn:
+        print("Adding name_sanitized column...")
+        await conn.execute(text(
+            "ALTER TABLE cameras ADD COLUMN IF NOT EXISTS name_sanitized VARCHAR"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_cameras_name_sanitized ON cameras (name_sanitized)"
+        ))
+
+        print("Backfilling name_sanitized...")
+        result = await conn.execute(text(
+            "SELECT id, name FROM cameras WHERE name_sanitized IS NULL AND name IS NOT NULL"
+        ))
+        rows = [
+            {"id": camera_id, "name_sanitized": sanitize_name(name)}
+            for camera_id, name in result
+        ]
+        if rows:
+            await conn.execute(
+                text("UPDATE cameras SET name_sanitized = :name_sanitized WHERE id = :id"),
+                rows
+            )
+
+        print(f"Column added, {len(rows)} cameras backfilled!")
+
+if __name__ == "__main__":
+    asyncio.run(add_column())
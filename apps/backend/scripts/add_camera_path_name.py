@@ -0,0 +1,42 @@
+"""
+Script to add the path_name column to the cameras table and backfill it.
+Run this once on databases created before cameras.path_name existed.
+"""
+import asyncio
+from sqlalchemy import text
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from services.mediamtx import sanitize_path_name
+
+async def add_column():
+    async with engine.begin() as conn:
+        print("Adding path_name column...")
+        await conn.execute(text(
+            "ALTER TABLE cameras ADD COLUMN IF NOT EXISTS path_name VARCHAR"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_cameras_path_name ON cameras (path_name)"
+        ))
+
+        print("Backfilling path_name...")
+        result = await conn.execute(text(
+            "SELECT id, name FROM cameras WHERE path_name IS NULL AND name IS NOT NULL"
+        ))
+        rows = [
+            {"id": camera_id, "path_name": sanitize_path_name(name)}
+            for camera_id, name in result
+        ]
+        if rows:
+            await conn.execute(
+                text("UPDATE cameras SET path_name = :path_name WHERE id = :id"),
+                rows
+            )
+
+        print(f"Column added, {len(rows)} cameras backfilled!")
+
+if __name__ == "__main__":
+    asyncio.run(add_column())
@@ -0,0 +1,24 @@
+"""
+Script to add the duration_seconds column to the recording_files table.
+Run this once on databases created before recording_files.duration_seconds existed.
+Existing rows are filled in by the recording indexer as it probes them.
+"""
+import asyncio
+from sqlalchemy import text
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+
+async def add_column():
+    async with engine.begin() as conn:
+        print("Adding duration_seconds column...")
+        await conn.execute(text(
+            "ALTER TABLE recording_files ADD COLUMN IF NOT EXISTS duration_seconds INTEGER"
+        ))
+        print("Column added!")
+
+if __name__ == "__main__":
+    asyncio.run(add_column())
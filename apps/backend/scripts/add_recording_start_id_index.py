@@ -0,0 +1,24 @@
+"""
+Script to add the (start_time, id) index used by recording search pagination.
+Run this once on databases created before ix_recording_files_start_id existed.
+"""
+import asyncio
+from sqlalchemy import text
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+
+async def add_index():
+    async with engine.begin() as conn:
+        print("Adding ix_recording_files_start_id index...")
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_recording_files_start_id "
+            "ON recording_files (start_time, id)"
+        ))
+        print("Index added!")
+
+if __name__ == "__main__":
+    asyncio.run(add_index())
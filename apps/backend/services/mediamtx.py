@@ -1,8 +1,9 @@
 import httpx
 import asyncio
 import os
-import re
-from typing import Optional, Literal, Tuple
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Literal, Tuple
 
 # Use localhost by default (for local dev), docker uses MEDIAMTX_API_URL env var
 MEDIAMTX_API_URL = os.getenv("MEDIAMTX_API_URL", "http://localhost:9997")
@@ -11,11 +12,45 @@ MEDIAMTX_API_URL = os.getenv("MEDIAMTX_API_URL", "http://localhost:9997")
 STREAM_READY_TIMEOUT = 15  # seconds
 STREAM_CHECK_INTERVAL = 2  # seconds
 
+# Recording status is polled by the UI; answers are cached briefly and
+# updated write-through by set_recording_enabled
+RECORDING_STATUS_CACHE_TTL = 2  # seconds
+_recording_status_cache: Dict[str, Tuple[float, bool]] = {}
 
+# Runtime path list behind the active-streams and per-camera status routes,
+# which dashboards poll every few seconds
+PATHS_LIST_CACHE_TTL = 2  # seconds
+_paths_list_cache = {"items": None, "expires": 0.0}
+_paths_list_lock = asyncio.Lock()
+
+# Byte tables for sanitize_path_name: spaces become '_', letters are
+# lowercased, and every byte outside [A-Za-z0-9_ -] is deleted
+_PATH_NAME_ALLOWED = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_- ")
+_PATH_NAME_TABLE = bytes.maketrans(
+    b" ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    b"_abcdefghijklmnopqrstuvwxyz"
+)
+_PATH_NAME_DELETE = bytes(b for b in range(256) if b not in _PATH_NAME_ALLOWED)
+
+
+@lru_cache(maxsize=4096)
 def sanitize_path_name(name: str) -> str:
-    """Convert camera name to a valid path name for MediaMTX."""
-    sanitized = re.sub(r'[^a-zA-Z0-9_-]', '', name.replace(' ', '_'))
-    return sanitized.lower()
+    """
+    Convert camera name to a valid path name for MediaMTX.
+    Memoized: every camera route calls this with the same few names.
+    """
+    # Non-ASCII characters are never allowed, so drop them before the
+    # single C-level translate pass
+    ascii_name = name.encode('ascii', 'ignore')
+    return ascii_name.translate(_PATH_NAME_TABLE, _PATH_NAME_DELETE).decode('ascii')
+
+
+def sanitize_name(name: str) -> str:
+    """
+    Convert camera name to the legacy /recordings/{name} folder format.
+    Unlike sanitize_path_name, other characters are kept as they are.
+    """
+    return name.lower().replace(" ", "_").replace("-", "_")
 
 
 def _build_record_path(
@@ -212,7 +247,23 @@ async def add_camera_path(
         final_mode indicates which mode was used ('direct' or 'ffmpeg')
     """
     print(f"Adding camera path {path_name} with mode={mode}")
-    
+    try:
+        return await _add_camera_path_with_mode(path_name, rtsp_url, mode, tenant_slug, location_name)
+    finally:
+        # Only once MediaMTX has the path: a read while it was being added
+        # would otherwise re-cache the old state for the full TTL
+        _recording_status_cache.pop(path_name, None)
+        _invalidate_paths_list()
+
+
+async def _add_camera_path_with_mode(
+    path_name: str,
+    rtsp_url: str,
+    mode: Literal["auto", "direct", "ffmpeg"],
+    tenant_slug: Optional[str],
+    location_name: Optional[str]
+) -> Tuple[bool, str]:
+    """Configure the path in MediaMTX for add_camera_path()."""
     # Build the recording path: /recordings/tenant/location/camera
     record_path = _build_record_path(tenant_slug, location_name, path_name)
     print(f"Recording path: {record_path}")
@@ -302,6 +353,10 @@ async def remove_camera_path(path_name: str) -> bool:
     except Exception as e:
         print(f"Error removing camera path from MediaMTX: {e}")
         return False
+    finally:
+        # Once the delete is done, so no read re-caches the old state
+        _recording_status_cache.pop(path_name, None)
+        _invalidate_paths_list()
 
 
 async def get_camera_path(path_name: str) -> Optional[dict]:
@@ -330,25 +385,54 @@ async def get_camera_path(path_name: str) -> Optional[dict]:
         return None
 
 
-async def list_active_paths() -> list:
+async def _get_paths_list() -> Optional[list]:
     """
-    List all active paths in MediaMTX.
+    Items of MediaMTX's runtime path list, cached for PATHS_LIST_CACHE_TTL seconds.
+    Concurrent callers on a miss share a single request.
     
     Returns:
-        List of active path dicts
+        List of path dicts, or None if MediaMTX answered with an error status
+    
+    Raises:
+        httpx.HTTPError: If MediaMTX could not be reached
     """
-    try:
+    if _paths_list_cache["items"] is not None and time.monotonic() < _paths_list_cache["expires"]:
+        return _paths_list_cache["items"]
+    
+    async with _paths_list_lock:
+        # Another caller may have refreshed it while we waited
+        if _paths_list_cache["items"] is not None and time.monotonic() < _paths_list_cache["expires"]:
+            return _paths_list_cache["items"]
+        
         async with httpx.AsyncClient() as client:
             response = await client.get(
                 f"{MEDIAMTX_API_URL}/v3/paths/list",
                 timeout=10.0
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("items", [])
-            return []
-            
+        
+        if response.status_code != 200:
+            return None
+        
+        items = response.json().get("items", [])
+        _paths_list_cache["items"] = items
+        _paths_list_cache["expires"] = time.monotonic() + PATHS_LIST_CACHE_TTL
+        return items
+
+
+def _invalidate_paths_list():
+    """Force the next path list read to go to MediaMTX."""
+    _paths_list_cache["expires"] = 0.0
+
+
+async def list_active_paths() -> list:
+    """
+    List all active paths in MediaMTX.
+    
+    Returns:
+        List of active path dicts
+    """
+    try:
+        return await _get_paths_list() or []
     except Exception as e:
         print(f"Error listing paths from MediaMTX: {e}")
         return []
@@ -365,23 +449,15 @@ async def get_path_status(path_name: str) -> Optional[dict]:
         Path status dict if exists, None otherwise
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{MEDIAMTX_API_URL}/v3/paths/list",
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                for item in data.get("items", []):
-                    if item.get("name") == path_name:
-                        return {
-                            "ready": item.get("ready", False),
-                            "tracks": item.get("tracks", []),
-                            "bytesReceived": item.get("bytesReceived", 0),
-                            "readers": len(item.get("readers", []))
-                        }
-            return None
+        for item in await _get_paths_list() or []:
+            if item.get("name") == path_name:
+                return {
+                    "ready": item.get("ready", False),
+                    "tracks": item.get("tracks", []),
+                    "bytesReceived": item.get("bytesReceived", 0),
+                    "readers": len(item.get("readers", []))
+                }
+        return None
             
     except Exception as e:
         print(f"Error getting path status from MediaMTX: {e}")
@@ -413,6 +489,7 @@ async def set_recording_enabled(path_name: str, enabled: bool) -> bool:
             
             if response.status_code == 200:
                 print(f"Recording {'enabled' if enabled else 'disabled'} for path: {path_name}")
+                _recording_status_cache[path_name] = (time.monotonic() + RECORDING_STATUS_CACHE_TTL, enabled)
                 return True
             else:
                 print(f"Failed to update recording for {path_name}: {response.status_code} - {response.text}")
@@ -426,6 +503,7 @@ async def set_recording_enabled(path_name: str, enabled: bool) -> bool:
 async def get_recording_status(path_name: str) -> Optional[bool]:
     """
     Get the current recording status for a camera path.
+    Answers are cached for RECORDING_STATUS_CACHE_TTL seconds.
     
     Args:
         path_name: The name of the stream path
@@ -433,10 +511,16 @@ async def get_recording_status(path_name: str) -> Optional[bool]:
     Returns:
         True if recording is enabled, False if disabled, None if path not found
     """
+    cached = _recording_status_cache.get(path_name)
+    if cached is not None and time.monotonic() < cached[0]:
+        return cached[1]
+    
     try:
         config = await get_camera_path(path_name)
         if config:
-            return config.get("record", False)
+            enabled = config.get("record", False)
+            _recording_status_cache[path_name] = (time.monotonic() + RECORDING_STATUS_CACHE_TTL, enabled)
+            return enabled
         return None
     except Exception as e:
         print(f"Error getting recording status for {path_name}: {e}")
@@ -4,14 +4,20 @@ Uses ONVIF WS-Discovery and port scanning to find cameras on the local network.
 """
 
 import asyncio
+import os
 import socket
 import struct
 import re
-from typing import List, Optional, Dict
+import time
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor
 import ipaddress
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 
 @dataclass
 class DiscoveredCamera:
@@ -80,6 +86,95 @@ COMMON_RTSP_PATHS = {
     ],
 }
 
+# Substrings identifying a camera brand, checked in order
+BRAND_KEYWORDS = [
+    ("hikvision", "Hikvision"),
+    ("dahua", "Dahua"),
+    ("axis", "Axis"),
+    ("reolink", "Reolink"),
+    ("amcrest", "Amcrest"),
+    ("uniview", "Uniview"),
+    ("unv", "Uniview"),
+]
+
+# IEEE OUI registry, as shipped by the ieee-data package
+OUI_FILE = os.getenv("OUI_FILE", "/usr/share/ieee-data/oui.txt")
+
+# Fallback OUIs of common camera vendors, used when OUI_FILE is missing
+BUILTIN_OUIS = {
+    0x2857BE: "Hikvision", 0x4419B6: "Hikvision", 0xC056E3: "Hikvision",
+    0xBCAD28: "Hikvision", 0x4CBD8F: "Hikvision",
+    0x3CEF8C: "Dahua", 0x9002A9: "Dahua", 0xE0508B: "Dahua", 0x4C11BF: "Dahua",
+    0x00408C: "Axis", 0xACCC8E: "Axis", 0xB8A44F: "Axis",
+    0xEC71DB: "Reolink",
+    0x9C8ECD: "Amcrest",
+}
+
+
+def detect_brand(text: str) -> Optional[str]:
+    """Return the camera brand mentioned in `text` (scopes, vendor name), if any."""
+    text = text.lower()
+    for keyword, brand in BRAND_KEYWORDS:
+        if keyword in text:
+            return brand
+    return None
+
+
+def _load_oui_table() -> Dict[int, str]:
+    """
+    Load the OUI registry into a dict keyed by the 24-bit prefix.
+    Known camera vendors are reduced to their brand name.
+    """
+    table = dict(BUILTIN_OUIS)
+    try:
+        with open(OUI_FILE, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                # e.g. "28-57-BE   (hex)\t\tHangzhou Hikvision Digital Technology Co.,Ltd."
+                if "(hex)" not in line:
+                    continue
+                prefix, _, vendor = line.partition("(hex)")
+                vendor = vendor.strip()
+                try:
+                    oui = int(prefix.strip().replace("-", ""), 16)
+                except ValueError:
+                    continue
+                table[oui] = detect_brand(vendor) or vendor
+    except OSError:
+        pass
+    return table
+
+
+_OUI = _load_oui_table()
+
+
+def lookup_manufacturer(mac: str) -> Optional[str]:
+    """Manufacturer for a MAC address ('aa:bb:cc:dd:ee:ff'), from its OUI."""
+    try:
+        oui = int(mac.replace(":", "").replace("-", "")[:6], 16)
+    except ValueError:
+        return None
+    return _OUI.get(oui)
+
+
+def read_arp_table() -> Dict[str, str]:
+    """
+    IP -> MAC map from the kernel neighbour cache (/proc/net/arp, Linux only).
+    Hosts just reached by the port scan are in it, so one read covers every
+    host that finished checking at the same time.
+    """
+    arp = {}
+    try:
+        with open("/proc/net/arp") as f:
+            next(f, None)  # header
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 4 and fields[3] != "00:00:00:00:00:00":
+                    arp[fields[0]] = fields[3]
+    except OSError:
+        pass
+    return arp
+
+
 # ONVIF WS-Discovery message
 WS_DISCOVERY_MESSAGE = """<?xml version="1.0" encoding="UTF-8"?>
 <soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope" 
@@ -118,6 +213,27 @@ def get_local_network_range() -> Optional[str]:
         return None
 
 
+# The local network rarely changes, so its range is cached for a short while
+NETWORK_RANGE_CACHE_TTL = 60  # seconds
+_network_range_cache = {"value": None, "expires": 0.0}
+
+
+def get_cached_network_range() -> Optional[str]:
+    """
+    Same as get_local_network_range(), cached for NETWORK_RANGE_CACHE_TTL seconds.
+    Failed lookups (None) are not cached.
+    """
+    now = time.monotonic()
+    if _network_range_cache["value"] is not None and now < _network_range_cache["expires"]:
+        return _network_range_cache["value"]
+    
+    network_range = get_local_network_range()
+    if network_range is not None:
+        _network_range_cache["value"] = network_range
+        _network_range_cache["expires"] = now + NETWORK_RANGE_CACHE_TTL
+    return network_range
+
+
 def check_port(ip: str, port: int, timeout: float = 1.0) -> bool:
     """Check if a port is open on the given IP."""
     try:
@@ -130,136 +246,262 @@ def check_port(ip: str, port: int, timeout: float = 1.0) -> bool:
         return False
 
 
-def scan_ip_for_camera(ip: str, timeout: float = 1.0) -> Optional[DiscoveredCamera]:
+# Ports probed on every host; HTTP ports are only checked once RTSP answers
+RTSP_PORTS = [554, 8554]
+HTTP_PORTS = [80, 8080, 8000]
+
+# Concurrent connection attempts during a port scan
+PORT_SCAN_CONCURRENCY = 256
+
+# Upper bound on the per-connection timeout; LAN hosts answer well within it
+PORT_SCAN_MAX_TIMEOUT = 0.3  # seconds
+
+
+async def check_port_async(ip: str, port: int, timeout: float, semaphore: asyncio.Semaphore) -> bool:
     """
-    Scan a single IP for camera services (RTSP port 554, HTTP ports 80/8080).
+    Check if a port is open on the given IP without blocking the event loop.
     """
-    rtsp_ports = [554, 8554]
-    http_ports = [80, 8080, 8000]
-    
-    camera = None
-    
-    # Check RTSP ports
-    for port in rtsp_ports:
-        if check_port(ip, port, timeout):
-            camera = DiscoveredCamera(
-                ip=ip,
-                port=port,
-                discovery_method="port_scan",
-                rtsp_urls=[f"rtsp://{ip}:{port}{path}" for path in COMMON_RTSP_PATHS["generic"][:4]]
-            )
-            break
+    async with semaphore:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+
+async def _first_open_port(ip: str, ports: List[int], timeout: float, semaphore: asyncio.Semaphore) -> Optional[int]:
+    """Probe `ports` in parallel and return the first open one, in list order."""
+    results = await asyncio.gather(*(check_port_async(ip, port, timeout, semaphore) for port in ports))
+    for port, is_open in zip(ports, results):
+        if is_open:
+            return port
+    return None
+
+
+async def scan_ip_for_camera(ip: str, timeout: float, semaphore: asyncio.Semaphore) -> Optional[DiscoveredCamera]:
+    """
+    Scan a single IP for camera services (RTSP ports 554/8554, HTTP ports 80/8080/8000).
+    """
+    rtsp_port = await _first_open_port(ip, RTSP_PORTS, timeout, semaphore)
+    if rtsp_port is None:
+        return None
     
-    # If camera found, also check for ONVIF/HTTP
-    if camera:
-        for port in http_ports:
-            if check_port(ip, port, timeout):
-                camera.onvif_port = port
-                break
+    camera = DiscoveredCamera(
+        ip=ip,
+        port=rtsp_port,
+        discovery_method="port_scan",
+        rtsp_urls=[f"rtsp://{ip}:{rtsp_port}{path}" for path in COMMON_RTSP_PATHS["generic"][:4]]
+    )
     
+    # Camera found, also check for ONVIF/HTTP
+    camera.onvif_port = await _first_open_port(ip, HTTP_PORTS, timeout, semaphore)
     return camera
 
 
-async def scan_network_ports(network_range: str = None, timeout: float = 0.5, max_workers: int = 50) -> List[DiscoveredCamera]:
+def _identify_vendor(camera: DiscoveredCamera, arp: Dict[str, str]):
+    """Set the manufacturer (and brand-specific RTSP paths) from the camera's MAC OUI."""
+    mac = arp.get(camera.ip)
+    manufacturer = lookup_manufacturer(mac) if mac else None
+    if manufacturer:
+        camera.manufacturer = manufacturer
+        paths = COMMON_RTSP_PATHS.get(manufacturer.lower())
+        if paths:
+            camera.rtsp_urls = [f"rtsp://{camera.ip}:{camera.port}{path}" for path in paths]
+
+
+async def iter_network_ports(
+    network_range: str = None,
+    timeout: float = 0.5,
+    max_workers: int = PORT_SCAN_CONCURRENCY
+) -> AsyncIterator[DiscoveredCamera]:
     """
-    Scan the local network for devices with RTSP ports open.
+    Scan the local network for devices with RTSP ports open, yielding each
+    camera as soon as its host has been checked.
     
     Args:
         network_range: IP range to scan (e.g., '192.168.1.0/24'). Auto-detected if None.
-        timeout: Connection timeout per host
+        timeout: Connection timeout per host, capped at PORT_SCAN_MAX_TIMEOUT
         max_workers: Maximum concurrent connections
-    
-    Returns:
-        List of discovered cameras
     """
     if network_range is None:
-        network_range = get_local_network_range()
+        network_range = get_cached_network_range()
         if network_range is None:
-            return []
+            return
     
     print(f"Scanning network: {network_range}")
     
     try:
         network = ipaddress.ip_network(network_range, strict=False)
-        hosts = [str(ip) for ip in network.hosts()]
     except ValueError as e:
         print(f"Invalid network range: {e}")
-        return []
+        return
     
-    cameras = []
+    timeout = min(timeout, PORT_SCAN_MAX_TIMEOUT)
+    semaphore = asyncio.Semaphore(max_workers)
+    hosts = (str(ip) for ip in network.hosts())
     
-    # Use thread pool for concurrent scanning
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Create tasks for all hosts
-        tasks = [
-            loop.run_in_executor(executor, scan_ip_for_camera, ip, timeout)
-            for ip in hosts
-        ]
-        
-        # Wait for all tasks
-        results = await asyncio.gather(*tasks)
-        
-        # Collect found cameras
-        for result in results:
-            if result is not None:
-                cameras.append(result)
+    # Keep a bounded window of hosts in flight instead of one task per
+    # address up front, so large ranges (/16) don't allocate 65k tasks
+    pending = set()
+    
+    def fill():
+        for ip in hosts:
+            pending.add(asyncio.ensure_future(scan_ip_for_camera(ip, timeout, semaphore)))
+            if len(pending) >= max_workers:
+                break
+    
+    fill()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            fill()
+            cameras = [camera for camera in (task.result() for task in done) if camera is not None]
+            if not cameras:
+                continue
+            # Hosts just reached are in the neighbour cache; identify vendors
+            # by MAC so brand-specific RTSP paths can be suggested
+            arp = read_arp_table()
+            for camera in cameras:
+                _identify_vendor(camera, arp)
+                yield camera
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def scan_network_ports(
+    network_range: str = None,
+    timeout: float = 0.5,
+    max_workers: int = PORT_SCAN_CONCURRENCY
+) -> List[DiscoveredCamera]:
+    """
+    Scan the local network for devices with RTSP ports open.
+    
+    Args:
+        network_range: IP range to scan (e.g., '192.168.1.0/24'). Auto-detected if None.
+        timeout: Connection timeout per host, capped at PORT_SCAN_MAX_TIMEOUT
+        max_workers: Maximum concurrent connections
+    
+    Returns:
+        List of discovered cameras, in address order
+    """
+    cameras = [camera async for camera in iter_network_ports(network_range, timeout, max_workers)]
+    cameras.sort(key=lambda camera: ipaddress.ip_address(camera.ip))
     
     print(f"Found {len(cameras)} potential cameras")
     return cameras
 
 
-async def discover_onvif_cameras(timeout: float = 3.0) -> List[DiscoveredCamera]:
+# WS-Discovery multicast address and port
+WS_DISCOVERY_MULTICAST = ("239.255.255.250", 3702)
+
+# Probes sent per interface; WS-Discovery runs over UDP, so a single probe
+# (or its replies) is easily lost
+WS_DISCOVERY_PROBE_REPEATS = 3
+
+
+def get_local_ipv4_addresses() -> List[str]:
     """
-    Discover cameras using ONVIF WS-Discovery protocol.
-    This uses UDP multicast to find ONVIF-compatible devices.
+    IPv4 addresses of all non-loopback interfaces.
+    Falls back to the address of the default route when psutil is not installed.
+    """
+    if psutil is not None:
+        addresses = []
+        for iface_addrs in psutil.net_if_addrs().values():
+            for addr in iface_addrs:
+                if addr.family == socket.AF_INET and not addr.address.startswith("127."):
+                    addresses.append(addr.address)
+        if addresses:
+            return addresses
     
-    Returns:
-        List of discovered ONVIF cameras
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+        s.close()
+        return [local_ip]
+    except Exception:
+        return []
+
+
+def _probe_one_iface(local_ip: Optional[str], timeout: float) -> List[Tuple[str, str]]:
     """
-    cameras = []
+    Send the WS-Discovery probe out of one interface and collect the replies.
+    Blocking: run it in a thread.
     
-    # WS-Discovery multicast address and port
-    MULTICAST_IP = "239.255.255.250"
-    MULTICAST_PORT = 3702
+    Args:
+        local_ip: Address of the interface to send from (None = default route)
+        timeout: How long to wait for replies
     
+    Returns:
+        List of (response, sender_ip) tuples
+    """
+    responses = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
     try:
-        # Create UDP socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.settimeout(timeout)
-        
-        # Send discovery message
-        sock.sendto(WS_DISCOVERY_MESSAGE.encode(), (MULTICAST_IP, MULTICAST_PORT))
+        if local_ip:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(local_ip))
+            sock.bind((local_ip, 0))
         
-        print("Sent ONVIF WS-Discovery probe, waiting for responses...")
+        # Retransmissions reuse the same MessageID, so devices answer once
+        message = WS_DISCOVERY_MESSAGE.encode()
+        for _ in range(WS_DISCOVERY_PROBE_REPEATS):
+            sock.sendto(message, WS_DISCOVERY_MULTICAST)
         
-        # Collect responses
-        start_time = asyncio.get_event_loop().time()
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
             try:
                 data, addr = sock.recvfrom(65535)
-                response = data.decode('utf-8', errors='ignore')
-                
-                # Parse the response to extract device info
-                camera = parse_onvif_response(response, addr[0])
-                if camera:
-                    # Check if we already have this IP
-                    if not any(c.ip == camera.ip for c in cameras):
-                        cameras.append(camera)
-                        print(f"Found ONVIF device: {camera.ip}")
             except socket.timeout:
                 break
-            except Exception as e:
-                print(f"Error receiving response: {e}")
-                continue
-        
+            responses.append((data.decode('utf-8', errors='ignore'), addr[0]))
+    except OSError as e:
+        print(f"ONVIF discovery error on {local_ip or 'default interface'}: {e}")
+    finally:
         sock.close()
-        
-    except Exception as e:
-        print(f"ONVIF discovery error: {e}")
     
-    return cameras
+    return responses
+
+
+async def discover_onvif_cameras(timeout: float = 3.0) -> List[DiscoveredCamera]:
+    """
+    Discover cameras using ONVIF WS-Discovery protocol.
+    This uses UDP multicast to find ONVIF-compatible devices. The probe is
+    sent from every local interface in parallel, so cameras on all attached
+    subnets are found within a single timeout.
+    
+    Returns:
+        List of discovered ONVIF cameras
+    """
+    interfaces = get_local_ipv4_addresses() or [None]
+    print(f"Sending ONVIF WS-Discovery probe on {len(interfaces)} interface(s), waiting for responses...")
+    
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_probe_one_iface, local_ip, timeout) for local_ip in interfaces),
+        return_exceptions=True
+    )
+    
+    # A device attached to several interfaces answers on each; keep one per IP
+    cameras: Dict[str, DiscoveredCamera] = {}
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"ONVIF discovery error: {result}")
+            continue
+        for response, ip in result:
+            if ip in cameras:
+                continue
+            camera = parse_onvif_response(response, ip)
+            if camera:
+                cameras[ip] = camera
+                print(f"Found ONVIF device: {camera.ip}")
+    
+    return list(cameras.values())
 
 
 def parse_onvif_response(response: str, ip: str) -> Optional[DiscoveredCamera]:
@@ -292,19 +534,7 @@ def parse_onvif_response(response: str, ip: str) -> Optional[DiscoveredCamera]:
                 name = name_match.group(1).replace('%20', ' ')
             
             # Try to detect manufacturer from scopes
-            scopes_lower = scopes.lower()
-            if 'hikvision' in scopes_lower:
-                manufacturer = 'Hikvision'
-            elif 'dahua' in scopes_lower:
-                manufacturer = 'Dahua'
-            elif 'axis' in scopes_lower:
-                manufacturer = 'Axis'
-            elif 'reolink' in scopes_lower:
-                manufacturer = 'Reolink'
-            elif 'amcrest' in scopes_lower:
-                manufacturer = 'Amcrest'
-            elif 'uniview' in scopes_lower or 'unv' in scopes_lower:
-                manufacturer = 'Uniview'
+            manufacturer = detect_brand(scopes)
         
         if xaddrs_match:
             xaddrs = xaddrs_match.group(1)
@@ -339,12 +569,90 @@ def parse_onvif_response(response: str, ip: str) -> Optional[DiscoveredCamera]:
         return None
 
 
+def _merge_camera(found: Dict[str, DiscoveredCamera], camera: DiscoveredCamera) -> DiscoveredCamera:
+    """
+    Add a camera to `found` (keyed by IP), merging it with an earlier hit on
+    the same IP. ONVIF info is preferred. Returns the merged entry.
+    """
+    existing = found.get(camera.ip)
+    if existing is None:
+        found[camera.ip] = camera
+        return camera
+    
+    if camera.discovery_method == "onvif":
+        camera.rtsp_urls = list(set(camera.rtsp_urls + existing.rtsp_urls))
+        found[camera.ip] = camera
+        return camera
+    
+    existing.rtsp_urls = list(set(existing.rtsp_urls + camera.rtsp_urls))
+    return existing
+
+
+async def iter_discovered_cameras(
+    use_onvif: bool = True,
+    use_port_scan: bool = True,
+    network_range: str = None,
+    scan_timeout: float = 0.5,
+    onvif_timeout: float = 3.0,
+    failures: Optional[List[Exception]] = None
+) -> AsyncIterator[DiscoveredCamera]:
+    """
+    Discover cameras like discover_cameras(), yielding them as they are found.
+    
+    Port-scan hits arrive one host at a time; ONVIF devices arrive together
+    when the probe window closes. A camera found by both methods is yielded
+    again with the merged info, so consumers should key results by IP.
+    
+    A method that fails doesn't stop the other one; its exception is appended
+    to `failures` when given.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def onvif():
+        for camera in await discover_onvif_cameras(onvif_timeout):
+            queue.put_nowait(camera)
+    
+    async def port_scan():
+        async for camera in iter_network_ports(network_range, scan_timeout):
+            queue.put_nowait(camera)
+    
+    async def run(method):
+        try:
+            await method()
+        except Exception as e:
+            print(f"Discovery error: {e}")
+            if failures is not None:
+                failures.append(e)
+        finally:
+            queue.put_nowait(None)  # This method is done
+    
+    runners = []
+    if use_onvif:
+        runners.append(asyncio.ensure_future(run(onvif)))
+    if use_port_scan:
+        runners.append(asyncio.ensure_future(run(port_scan)))
+    
+    found: Dict[str, DiscoveredCamera] = {}
+    pending = len(runners)
+    try:
+        while pending:
+            camera = await queue.get()
+            if camera is None:
+                pending -= 1
+                continue
+            yield _merge_camera(found, camera)
+    finally:
+        for runner in runners:
+            runner.cancel()
+
+
 async def discover_cameras(
     use_onvif: bool = True,
     use_port_scan: bool = True,
     network_range: str = None,
     scan_timeout: float = 0.5,
-    onvif_timeout: float = 3.0
+    onvif_timeout: float = 3.0,
+    failures: Optional[List[Exception]] = None
 ) -> List[DiscoveredCamera]:
     """
     Discover cameras on the network using multiple methods.
@@ -355,42 +663,85 @@ async def discover_cameras(
         network_range: Network range for port scan (auto-detected if None)
         scan_timeout: Timeout for port scan per host
         onvif_timeout: Timeout for ONVIF discovery
+        failures: If given, exceptions of failed methods are appended to it
+            (the cameras the other method found are still returned)
     
     Returns:
-        Combined list of discovered cameras (deduplicated by IP)
+        Combined list of discovered cameras (deduplicated by IP), ONVIF
+        cameras first, then in address order
     """
     all_cameras: Dict[str, DiscoveredCamera] = {}
     
-    # Run discovery methods
-    tasks = []
+    async for camera in iter_discovered_cameras(
+        use_onvif, use_port_scan, network_range, scan_timeout, onvif_timeout, failures
+    ):
+        all_cameras[camera.ip] = camera
     
-    if use_onvif:
-        tasks.append(discover_onvif_cameras(onvif_timeout))
+    # Results stream in completion order; sort so the list is stable
+    return sorted(
+        all_cameras.values(),
+        key=lambda camera: (camera.discovery_method != "onvif", ipaddress.ip_address(camera.ip))
+    )
+
+
+# Recent discovery results, keyed by (network_range, use_onvif, use_port_scan)
+DISCOVERY_CACHE_TTL = 20  # seconds
+_discovery_cache: Dict[tuple, Tuple[float, List[DiscoveredCamera]]] = {}
+_discovery_locks: Dict[tuple, asyncio.Lock] = {}
+
+
+async def discover_cameras_cached(
+    use_onvif: bool = True,
+    use_port_scan: bool = True,
+    network_range: str = None,
+    scan_timeout: float = 0.5,
+    onvif_timeout: float = 3.0,
+    force_refresh: bool = False
+) -> List[DiscoveredCamera]:
+    """
+    discover_cameras() with a short-lived result cache.
     
-    if use_port_scan:
-        tasks.append(scan_network_ports(network_range, scan_timeout))
+    Concurrent calls for the same key share a single scan: later callers wait
+    for the one in progress and reuse its result. If a discovery method fails,
+    the last cached result (even if stale) is returned instead; a partial
+    result is never cached.
     
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    Args:
+        force_refresh: Ignore cached results and scan again
+    """
+    key = (network_range or get_cached_network_range(), use_onvif, use_port_scan)
+    requested_at = time.monotonic()
     
-    # Merge results, preferring ONVIF info
-    for result in results:
-        if isinstance(result, Exception):
-            print(f"Discovery error: {result}")
-            continue
-            
-        for camera in result:
-            if camera.ip in all_cameras:
-                # Merge info, prefer ONVIF data
-                existing = all_cameras[camera.ip]
-                if camera.discovery_method == "onvif":
-                    camera.rtsp_urls = list(set(camera.rtsp_urls + existing.rtsp_urls))
-                    all_cameras[camera.ip] = camera
-                else:
-                    existing.rtsp_urls = list(set(existing.rtsp_urls + camera.rtsp_urls))
-            else:
-                all_cameras[camera.ip] = camera
+    cached = _discovery_cache.get(key)
+    if not force_refresh and cached and requested_at - cached[0] < DISCOVERY_CACHE_TTL:
+        return cached[1]
     
-    return list(all_cameras.values())
+    lock = _discovery_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        # A scan that finished while we were waiting is fresh enough
+        cached = _discovery_cache.get(key)
+        if cached and cached[0] >= requested_at:
+            return cached[1]
+        if not force_refresh and cached and time.monotonic() - cached[0] < DISCOVERY_CACHE_TTL:
+            return cached[1]
+        
+        failures: List[Exception] = []
+        cameras = await discover_cameras(
+            use_onvif=use_onvif,
+            use_port_scan=use_port_scan,
+            network_range=network_range,
+            scan_timeout=scan_timeout,
+            onvif_timeout=onvif_timeout,
+            failures=failures
+        )
+        if failures:
+            if cached:
+                print(f"Discovery failed, serving cached result: {failures[0]}")
+                return cached[1]
+            return cameras  # Partial, and not cached
+        
+        _discovery_cache[key] = (time.monotonic(), cameras)
+        return cameras
 
 
 # Utility function to test if an RTSP URL is valid
@@ -408,6 +759,7 @@ async def test_rtsp_url(url: str, timeout: float = 5.0) -> bool:
         host = match.group(1)
         port = int(match.group(2)) if match.group(2) else 554
         
-        return check_port(host, port, timeout)
+        # check_port blocks for up to `timeout`; keep it off the event loop
+        return await asyncio.to_thread(check_port, host, port, timeout)
     except:
         return False
@@ -9,8 +9,11 @@ import asyncio
 import hashlib
 import base64
 import os
+import random
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 from xml.etree import ElementTree as ET
 import aiohttp
@@ -26,6 +29,26 @@ NAMESPACES = {
     'tds': 'http://www.onvif.org/ver10/device/wsdl',
 }
 
+# Camera video configs rarely change; successful reads are kept this long,
+# keyed by (host, port, credentials digest)
+VIDEO_CONFIG_CACHE_TTL = 60  # seconds
+_video_config_cache: Dict[Tuple[str, int, str], Tuple[float, Dict[str, Any]]] = {}
+_video_config_inflight: Dict[Tuple[str, int, str], "asyncio.Future[Dict[str, Any]]"] = {}
+
+# Pooled ONVIF clients, keyed like the config cache, with their last use time
+ONVIF_CLIENT_IDLE_TTL = 300  # seconds
+_onvif_clients: Dict[Tuple[str, int, str], Tuple["ONVIFClient", float]] = {}
+_onvif_client_locks: Dict[Tuple[str, int, str], asyncio.Lock] = {}
+
+# Camera firmware often fails under concurrent ONVIF sessions, so only one
+# operation per device runs at a time; others wait up to this long
+ONVIF_DEVICE_WAIT_TIMEOUT = 10  # seconds
+_onvif_device_locks: Dict[str, asyncio.Lock] = {}
+
+
+class DeviceBusyError(Exception):
+    """Another ONVIF operation on the same device didn't finish in time."""
+
 
 @dataclass
 class VideoResolution:
@@ -132,6 +155,19 @@ class ONVIFClient:
         self.device_service_url = f"http://{host}:{port}/onvif/device_service"
         self.media_service_url = None  # Will be discovered
         self._capabilities_loaded = False
+        self.auth_failed = False
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """HTTP session kept open across requests, so the connection is reused."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
         
     async def _send_request(self, url: str, body: str, namespace_prefix: str = "trt") -> Optional[ET.Element]:
         """Send SOAP request and return parsed XML response"""
@@ -142,19 +178,21 @@ class ONVIFClient:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=envelope, headers=headers, timeout=10) as response:
-                    if response.status == 200:
-                        text = await response.text()
-                        # Register namespaces for parsing
-                        for prefix, uri in NAMESPACES.items():
-                            ET.register_namespace(prefix, uri)
-                        return ET.fromstring(text)
-                    else:
-                        print(f"ONVIF request failed: {response.status}")
-                        error_text = await response.text()
-                        print(f"Error: {error_text[:500]}")
-                        return None
+            session = self._get_session()
+            async with session.post(url, data=envelope, headers=headers, timeout=10) as response:
+                if response.status == 200:
+                    text = await response.text()
+                    # Register namespaces for parsing
+                    for prefix, uri in NAMESPACES.items():
+                        ET.register_namespace(prefix, uri)
+                    return ET.fromstring(text)
+                else:
+                    if response.status in (401, 403):
+                        self.auth_failed = True
+                    print(f"ONVIF request failed: {response.status}")
+                    error_text = await response.text()
+                    print(f"Error: {error_text[:500]}")
+                    return None
         except asyncio.TimeoutError:
             print(f"ONVIF request timeout to {url}")
             return None
@@ -616,6 +654,77 @@ class ONVIFClient:
         return False, "No response from camera"
 
 
+def _camera_key(host: str, port: int, username: Optional[str], password: Optional[str]) -> Tuple[str, int, str]:
+    """Cache key for a camera; credentials are hashed so they aren't kept in memory."""
+    digest = hashlib.sha1(f"{username}:{password}".encode()).hexdigest()
+    return (host, port, digest)
+
+
+@asynccontextmanager
+async def onvif_device_slot(host: str):
+    """
+    Hold the ONVIF slot of a device for the duration of the block.
+    
+    Raises:
+        DeviceBusyError: If the slot wasn't free within ONVIF_DEVICE_WAIT_TIMEOUT
+    """
+    lock = _onvif_device_locks.setdefault(host, asyncio.Lock())
+    try:
+        await asyncio.wait_for(lock.acquire(), ONVIF_DEVICE_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise DeviceBusyError(f"Camera {host} is busy with another ONVIF operation")
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+async def get_onvif_client(
+    host: str, 
+    port: int = 80, 
+    username: str = None, 
+    password: str = None
+) -> ONVIFClient:
+    """
+    Pooled ONVIFClient for a camera, with its media service URL already discovered.
+    
+    Clients keep their HTTP session open and are reused across requests.
+    A client is replaced after ONVIF_CLIENT_IDLE_TTL seconds without use,
+    after an authentication failure, or if service discovery didn't succeed.
+    """
+    key = _camera_key(host, port, username, password)
+    lock = _onvif_client_locks.setdefault(key, asyncio.Lock())
+    
+    async with lock:
+        now = time.monotonic()
+        
+        # Close clients that have been idle too long
+        for idle_key in [k for k, (_, last_used) in _onvif_clients.items() if now - last_used > ONVIF_CLIENT_IDLE_TTL]:
+            idle_client, _ = _onvif_clients.pop(idle_key)
+            await idle_client.close()
+        
+        cached = _onvif_clients.get(key)
+        if cached is not None:
+            client, _ = cached
+            if not client.auth_failed and client._capabilities_loaded:
+                _onvif_clients[key] = (client, now)
+                return client
+            del _onvif_clients[key]
+            await client.close()
+        
+        client = ONVIFClient(host, port, username, password)
+        await client._ensure_media_url()
+        _onvif_clients[key] = (client, now)
+        return client
+
+
+async def close_onvif_clients():
+    """Close every pooled ONVIF client (called on shutdown)."""
+    for client, _ in _onvif_clients.values():
+        await client.close()
+    _onvif_clients.clear()
+
+
 async def get_camera_video_config(
     host: str, 
     port: int = 80, 
@@ -627,76 +736,121 @@ async def get_camera_video_config(
     Returns profiles, encoder configs, and available options.
     """
     print(f"get_camera_video_config: Starting for {host}:{port}")
-    client = ONVIFClient(host, port, username, password)
-    
-    result = {
-        "host": host,
-        "port": port,
-        "profiles": [],
-        "encoder_configs": [],
-        "options": None,
-        "error": None
-    }
-    
-    try:
-        # Get profiles
-        print("get_camera_video_config: Getting profiles...")
-        profiles = await client.get_profiles()
-        print(f"get_camera_video_config: Got {len(profiles)} profiles")
-        result["profiles"] = [
-            {
-                "token": p.token,
-                "name": p.name,
-                "video_encoder_token": p.video_encoder_token
-            }
-            for p in profiles
-        ]
-        
-        # Get encoder configurations
-        print("get_camera_video_config: Getting encoder configs...")
-        configs = await client.get_video_encoder_configurations()
-        print(f"get_camera_video_config: Got {len(configs)} encoder configs")
-        result["encoder_configs"] = [
-            {
-                "token": c.token,
-                "name": c.name,
-                "encoding": c.encoding,
-                "resolution": {"width": c.resolution.width, "height": c.resolution.height},
-                "quality": c.quality,
-                "framerate_limit": c.framerate_limit,
-                "bitrate_limit": c.bitrate_limit,
-                "gov_length": c.gov_length,
-                "profile": c.profile
-            }
-            for c in configs
-        ]
-        
-        # Get options (from first profile if available)
-        if profiles:
-            print("get_camera_video_config: Getting encoder options...")
-            options = await client.get_video_encoder_options(profile_token=profiles[0].token)
-            if options:
-                result["options"] = {
-                    "encoding_options": options.encoding_options,
-                    "resolution_options": [
-                        {"width": r.width, "height": r.height}
-                        for r in options.resolution_options
-                    ],
-                    "quality_range": options.quality_range,
-                    "framerate_range": options.framerate_range,
-                    "bitrate_range": options.bitrate_range,
-                    "gov_length_range": options.gov_length_range,
-                    "h264_profiles": options.h264_profiles,
-                    "h265_profiles": options.h265_profiles
+    async with onvif_device_slot(host):
+        client = await get_onvif_client(host, port, username, password)
+        
+        result = {
+            "host": host,
+            "port": port,
+            "profiles": [],
+            "encoder_configs": [],
+            "options": None,
+            "error": None
+        }
+        
+        try:
+            # Get profiles
+            print("get_camera_video_config: Getting profiles...")
+            profiles = await client.get_profiles()
+            print(f"get_camera_video_config: Got {len(profiles)} profiles")
+            result["profiles"] = [
+                {
+                    "token": p.token,
+                    "name": p.name,
+                    "video_encoder_token": p.video_encoder_token
+                }
+                for p in profiles
+            ]
+            
+            # Get encoder configurations
+            print("get_camera_video_config: Getting encoder configs...")
+            configs = await client.get_video_encoder_configurations()
+            print(f"get_camera_video_config: Got {len(configs)} encoder configs")
+            result["encoder_configs"] = [
+                {
+                    "token": c.token,
+                    "name": c.name,
+                    "encoding": c.encoding,
+                    "resolution": {"width": c.resolution.width, "height": c.resolution.height},
+                    "quality": c.quality,
+                    "framerate_limit": c.framerate_limit,
+                    "bitrate_limit": c.bitrate_limit,
+                    "gov_length": c.gov_length,
+                    "profile": c.profile
                 }
+                for c in configs
+            ]
+            
+            # Get options (from first profile if available)
+            if profiles:
+                print("get_camera_video_config: Getting encoder options...")
+                options = await client.get_video_encoder_options(profile_token=profiles[0].token)
+                if options:
+                    result["options"] = {
+                        "encoding_options": options.encoding_options,
+                        "resolution_options": [
+                            {"width": r.width, "height": r.height}
+                            for r in options.resolution_options
+                        ],
+                        "quality_range": options.quality_range,
+                        "framerate_range": options.framerate_range,
+                        "bitrate_range": options.bitrate_range,
+                        "gov_length_range": options.gov_length_range,
+                        "h264_profiles": options.h264_profiles,
+                        "h265_profiles": options.h265_profiles
+                    }
+            
+            print(f"get_camera_video_config: Complete - profiles={len(result['profiles'])}, encoders={len(result['encoder_configs'])}")
+        
+        except Exception as e:
+            print(f"get_camera_video_config: Error - {e}")
+            result["error"] = str(e)
         
-        print(f"get_camera_video_config: Complete - profiles={len(result['profiles'])}, encoders={len(result['encoder_configs'])}")
+        return result
+
+
+def invalidate_video_config_cache(host: str, port: int):
+    """Drop cached configs of a camera, for every set of credentials."""
+    for key in [k for k in _video_config_cache if k[0] == host and k[1] == port]:
+        _video_config_cache.pop(key, None)
+
+
+async def get_camera_video_config_cached(
+    host: str, 
+    port: int = 80, 
+    username: str = None, 
+    password: str = None
+) -> Dict[str, Any]:
+    """
+    Same as get_camera_video_config(), cached for VIDEO_CONFIG_CACHE_TTL seconds.
     
-    except Exception as e:
-        print(f"get_camera_video_config: Error - {e}")
-        result["error"] = str(e)
+    Entries are refreshed a little early at random, during the last 20% of
+    their lifetime, so pollers of a popular camera don't all miss at once.
+    Concurrent misses for the same camera share one fetch. Failed reads are
+    not cached.
+    """
+    key = _camera_key(host, port, username, password)
+    cached = _video_config_cache.get(key)
+    if cached is not None:
+        expires, result = cached
+        early = VIDEO_CONFIG_CACHE_TTL * 0.2 * random.random()
+        if time.monotonic() < expires - early:
+            return result
     
-    return result
+    task = _video_config_inflight.get(key)
+    if task is None:
+        async def fetch():
+            result = await get_camera_video_config(host, port, username, password)
+            if not result.get("error"):
+                _video_config_cache[key] = (time.monotonic() + VIDEO_CONFIG_CACHE_TTL, result)
+            return result
+        
+        task = asyncio.ensure_future(fetch())
+        _video_config_inflight[key] = task
+        task.add_done_callback(lambda _: _video_config_inflight.pop(key, None))
+    
+    # Shielded so a caller that goes away doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
 
 
 async def update_camera_video_config(
@@ -717,48 +871,51 @@ async def update_camera_video_config(
     """
     Update video encoder configuration on a camera.
     """
-    client = ONVIFClient(host, port, username, password)
-    
-    result = {
-        "success": False,
-        "error": None,
-        "updated_config": None
-    }
-    
-    try:
-        success, error_msg = await client.set_video_encoder_configuration(
-            token=config_token,
-            encoding=encoding,
-            width=width,
-            height=height,
-            framerate=framerate,
-            bitrate=bitrate,
-            quality=quality,
-            gov_length=gov_length,
-            profile=profile
-        )
+    async with onvif_device_slot(host):
+        client = await get_onvif_client(host, port, username, password)
         
-        result["success"] = success
-        
-        if success:
-            # Get updated configuration
-            updated = await client.get_video_encoder_configuration(config_token)
-            if updated:
-                result["updated_config"] = {
-                    "token": updated.token,
-                    "name": updated.name,
-                    "encoding": updated.encoding,
-                    "resolution": {"width": updated.resolution.width, "height": updated.resolution.height},
-                    "quality": updated.quality,
-                    "framerate_limit": updated.framerate_limit,
-                    "bitrate_limit": updated.bitrate_limit,
-                    "gov_length": updated.gov_length,
-                    "profile": updated.profile
-                }
-        else:
-            result["error"] = error_msg or "Failed to update configuration"
-    
-    except Exception as e:
-        result["error"] = str(e)
-    
-    return result
+        result = {
+            "success": False,
+            "error": None,
+            "updated_config": None
+        }
+        
+        try:
+            success, error_msg = await client.set_video_encoder_configuration(
+                token=config_token,
+                encoding=encoding,
+                width=width,
+                height=height,
+                framerate=framerate,
+                bitrate=bitrate,
+                quality=quality,
+                gov_length=gov_length,
+                profile=profile
+            )
+            
+            result["success"] = success
+            
+            if success:
+                invalidate_video_config_cache(host, port)
+                
+                # Get updated configuration
+                updated = await client.get_video_encoder_configuration(config_token)
+                if updated:
+                    result["updated_config"] = {
+                        "token": updated.token,
+                        "name": updated.name,
+                        "encoding": updated.encoding,
+                        "resolution": {"width": updated.resolution.width, "height": updated.resolution.height},
+                        "quality": updated.quality,
+                        "framerate_limit": updated.framerate_limit,
+                        "bitrate_limit": updated.bitrate_limit,
+                        "gov_length": updated.gov_length,
+                        "profile": updated.profile
+                    }
+            else:
+                result["error"] = error_msg or "Failed to update configuration"
+        
+        except Exception as e:
+            result["error"] = str(e)
+        
+        return result
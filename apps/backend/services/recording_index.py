@@ -0,0 +1,577 @@
+"""
+Vigila.io - Recording Index Service
+
+Keeps the recording_files table in step with the MP4 segments MediaMTX
+writes under /recordings, so recording searches are indexed SQL queries
+instead of directory scans on every request.
+
+Handles:
+1. A full reconcile of the index against the filesystem on startup
+2. Incremental syncs in the background: a folder is only rescanned when its
+   mtime changes (a segment was added or removed); otherwise just its newest
+   segment, which may still be growing, is re-stat'ed
+3. Dropping index rows right away when recordings are deleted via the API
+"""
+import os
+import re
+import asyncio
+import logging
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import datetime
+from typing import Callable, Optional, Set, Tuple, List, Dict
+
+from sqlalchemy import select, delete, insert, bindparam, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    from watchfiles import Change, awatch
+except ImportError:
+    awatch = None
+
+from database import AsyncSessionLocal
+from models import Camera, RecordingFile
+from services.stream_probe import probe_file_duration
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+RECORDINGS_BASE_PATH = "/recordings"
+
+# How often the index is synced with the filesystem. With watchfiles, changes
+# also trigger a sync right away; polling then only backs up lost events.
+INDEX_INTERVAL_SECONDS = 30
+
+# Threads used to list changed folders during a sync
+INDEX_SCAN_WORKERS = 8
+
+# Finished segments whose real duration is probed after each sync, and how
+# many probes run at once
+DURATION_PROBE_BATCH = 50
+DURATION_PROBE_CONCURRENCY = 4
+
+
+# =============================================================================
+# Filesystem Helpers
+# =============================================================================
+
+# MediaMTX recording filename: YYYY-MM-DD_HH-MM-SS.mp4
+_RECORDING_FILENAME_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})_(\d{2})-(\d{2})-(\d{2})\.mp4")
+
+
+@lru_cache(maxsize=16384)
+def parse_recording_filename(filename: str) -> Optional[datetime]:
+    """Parse MediaMTX recording filename format: YYYY-MM-DD_HH-MM-SS.mp4"""
+    match = _RECORDING_FILENAME_RE.fullmatch(filename)
+    if match is None:
+        return None
+    try:
+        return datetime(*map(int, match.groups()))
+    except ValueError:
+        return None  # Out-of-range date or time
+
+
+def get_file_duration_estimate(file_size_bytes: int) -> int:
+    """Estimate duration based on file size (rough estimate for 1080p ~60MB/min)"""
+    mb = file_size_bytes / (1024 * 1024)
+    # Approximately 1 MB per second for typical 1080p h264
+    return int(mb)
+
+
+def _camera_id_from_folder(folder_name: str) -> Optional[int]:
+    """Camera ID from a camera_{id} folder name."""
+    try:
+        return int(folder_name.replace("camera_", ""))
+    except ValueError:
+        return None
+
+
+def list_recording_folders(base_path: str) -> Dict[str, Tuple[Optional[int], Optional[str], int]]:
+    """
+    Find the camera folders under base_path.
+
+    Structures:
+    - tenant_X/location_X/camera_X
+    - camera_X
+    - {camera_name} (legacy)
+
+    Returns:
+        Dict of folder (relative to base_path) -> (camera ID from the folder
+        name, legacy camera folder name, folder mtime in ns)
+    """
+    folders = {}
+    if not os.path.isdir(base_path):
+        return folders
+
+    with os.scandir(base_path) as top_entries:
+        for top in top_entries:
+            if not top.is_dir():
+                continue
+
+            if top.name.startswith("tenant_"):
+                with os.scandir(top.path) as location_entries:
+                    for location in location_entries:
+                        if not (location.name.startswith("location_") and location.is_dir()):
+                            continue
+                        with os.scandir(location.path) as camera_entries:
+                            for camera in camera_entries:
+                                if camera.name.startswith("camera_") and camera.is_dir():
+                                    folder = f"{top.name}/{location.name}/{camera.name}"
+                                    folders[folder] = (
+                                        _camera_id_from_folder(camera.name),
+                                        None,
+                                        camera.stat().st_mtime_ns
+                                    )
+            elif top.name.startswith("camera_"):
+                folders[top.name] = (_camera_id_from_folder(top.name), None, top.stat().st_mtime_ns)
+            else:
+                folders[top.name] = (None, top.name, top.stat().st_mtime_ns)
+
+    return folders
+
+
+def scan_recording_folder(folder_path: str) -> Dict[str, int]:
+    """
+    List the recordings in a folder.
+    Returns dict: {filename: size_bytes}. Start times come from the filename
+    (parse_recording_filename), so they aren't stored per file.
+    """
+    recordings = {}
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".mp4"):
+                    continue
+                if parse_recording_filename(entry.name) is None:
+                    continue
+                try:
+                    if entry.is_file():
+                        recordings[entry.name] = entry.stat().st_size
+                except OSError:
+                    continue  # Deleted while scanning
+    except FileNotFoundError:
+        pass
+    return recordings
+
+
+async def find_recordings(base_path: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """
+    List every recording under base_path with a single `find` call, so a cold
+    start walks the tree in one process instead of a scandir per folder.
+
+    Returns dict: {folder (relative to base_path): {filename: size_bytes}}, or
+    None when GNU find isn't available or fails (callers scan folder by folder).
+    """
+    if shutil.which("find") is None or not os.path.isdir(base_path):
+        return None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "find", base_path, "-mindepth", "2", "-maxdepth", "4",
+            "-type", "f", "-name", "*.mp4", "-printf", "%P\\t%s\\n",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+    except OSError:
+        return None
+    if process.returncode != 0:
+        return None  # e.g. BusyBox find without -printf
+
+    listings: Dict[str, Dict[str, int]] = {}
+    for line in stdout.decode(errors="replace").splitlines():
+        path, _, size = line.rpartition("\t")
+        folder_name, _, filename = path.rpartition("/")
+        if not folder_name or parse_recording_filename(filename) is None:
+            continue
+        listings.setdefault(folder_name, {})[filename] = int(size)
+    return listings
+
+
+# =============================================================================
+# Index Sync
+# =============================================================================
+
+@dataclass
+class _FolderState:
+    """What the index holds for one folder."""
+    camera_id: Optional[int]
+    mtime_ns: Optional[int]  # None forces a rescan
+    files: Dict[str, int] = field(default_factory=dict)  # filename -> size
+
+
+@dataclass
+class _IndexChanges:
+    added: List[Dict] = field(default_factory=list)
+    resized: List[Dict] = field(default_factory=list)
+    removed: Dict[str, List[str]] = field(default_factory=dict)  # folder -> filenames
+
+
+class RecordingIndexer:
+    """
+    Background task that keeps the recording_files table in sync with the
+    filesystem.
+    """
+
+    def __init__(self, base_path: str = RECORDINGS_BASE_PATH):
+        self.base_path = base_path
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.last_sync: Optional[datetime] = None
+        # Bumped whenever recordings are added to or removed from the index,
+        # so responses derived from it can be cached until it changes
+        self.generation = 0
+        self._folders: Optional[Dict[str, _FolderState]] = None
+        self._lock = asyncio.Lock()
+        # Filesystem watch (watchfiles/inotify), when available
+        self.watch_task: Optional[asyncio.Task] = None
+        self.watching = False
+        self._wake = asyncio.Event()
+        self._stop_watch = asyncio.Event()
+        self._change_listeners: List[Callable[[Set[str]], None]] = []
+
+    def add_change_listener(self, listener: Callable[[Set[str]], None]):
+        """
+        Call listener with the set of changed paths (files and their folders)
+        whenever the watcher sees changes under base_path.
+        """
+        self._change_listeners.append(listener)
+
+    async def start(self):
+        """Start the background sync task."""
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._sync_loop())
+        if awatch is not None:
+            self._stop_watch.clear()
+            self.watch_task = asyncio.create_task(self._watch_loop())
+        logger.info("Recording indexer started")
+
+    async def stop(self):
+        """Stop the background sync task."""
+        self.running = False
+        self._stop_watch.set()
+        for task in (self.task, self.watch_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        logger.info("Recording indexer stopped")
+
+    async def _watch_loop(self):
+        """Wake the sync loop and notify listeners as soon as files change."""
+        try:
+            self.watching = True
+            async for changes in awatch(self.base_path, stop_event=self._stop_watch):
+                # Only files appearing or disappearing change the index; the
+                # segment MediaMTX is writing grows constantly and is left
+                # to the periodic sync
+                paths = set()
+                for change, path in changes:
+                    if change != Change.modified:
+                        paths.add(path)
+                        paths.add(os.path.dirname(path))
+                if not paths:
+                    continue
+                for listener in self._change_listeners:
+                    listener(paths)
+                self._wake.set()
+        except Exception as e:
+            logger.error(f"Error watching {self.base_path}, falling back to polling: {e}")
+        finally:
+            self.watching = False
+
+    async def _sync_loop(self):
+        """Main sync loop."""
+        while self.running:
+            try:
+                await self.sync()
+                await self.probe_durations()
+            except Exception as e:
+                logger.error(f"Error syncing recording index: {e}")
+                self._folders = None  # Reconcile from the database next time
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), INDEX_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def has_folder(self, folder_name: str) -> Optional[bool]:
+        """
+        Whether the last sync saw a camera folder (relative to base_path).
+        None until the first sync has run.
+        """
+        if self._folders is None:
+            return None
+        return folder_name in self._folders
+
+    async def _load_index(self, db: AsyncSession) -> Dict[str, _FolderState]:
+        """Load what the index currently holds, with every folder marked for rescan."""
+        folders: Dict[str, _FolderState] = {}
+        result = await db.execute(select(
+            RecordingFile.folder_name,
+            RecordingFile.filename,
+            RecordingFile.camera_id,
+            RecordingFile.file_size
+        ))
+        for folder_name, filename, camera_id, file_size in result:
+            state = folders.get(folder_name)
+            if state is None:
+                state = folders[folder_name] = _FolderState(camera_id, None)
+            state.files[filename] = file_size
+        return folders
+
+    def _collect_changes(
+        self,
+        folders: Dict[str, Tuple[Optional[int], Optional[str], int]],
+        camera_ids: set,
+        camera_by_name: Dict[str, int],
+        found: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> _IndexChanges:
+        """
+        Diff the filesystem against the index state and update the state.
+        Folders listed in `found` (from find_recordings) aren't scanned again.
+        Blocking: run it in a thread.
+        """
+        changes = _IndexChanges()
+        base_prefix = self.base_path + "/"
+        to_scan: List[Tuple[str, _FolderState, int]] = []
+
+        # Folders that are gone
+        for folder_name in [f for f in self._folders if f not in folders]:
+            state = self._folders.pop(folder_name)
+            if state.camera_id is not None and state.files:
+                changes.removed[folder_name] = list(state.files)
+
+        for folder_name, (folder_camera_id, legacy_name, mtime_ns) in folders.items():
+            if legacy_name is not None:
+                camera_id = camera_by_name.get(legacy_name)
+            else:
+                camera_id = folder_camera_id if folder_camera_id in camera_ids else None
+
+            state = self._folders.get(folder_name)
+            if state is not None and state.camera_id != camera_id:
+                # Folder now belongs to another camera (or none): index it afresh
+                if state.camera_id is not None and state.files:
+                    changes.removed.setdefault(folder_name, []).extend(state.files)
+                state = None
+            if state is None:
+                state = self._folders[folder_name] = _FolderState(camera_id, None)
+
+            if camera_id is None:
+                state.mtime_ns = mtime_ns
+                continue
+
+            folder_path = base_prefix + folder_name
+
+            if state.mtime_ns == mtime_ns:
+                # No segment added or removed; only the newest one can still grow
+                if state.files:
+                    newest = max(state.files)
+                    try:
+                        size = os.stat(folder_path + "/" + newest).st_size
+                    except OSError:
+                        state.mtime_ns = None  # Rescan next time
+                        continue
+                    if size != state.files[newest]:
+                        state.files[newest] = size
+                        changes.resized.append({"b_folder": folder_name, "b_filename": newest, "b_size": size})
+                continue
+
+            to_scan.append((folder_name, state, mtime_ns))
+
+        # Changed folders are listed concurrently: on network mounts each
+        # listing is mostly waiting on the server
+        if found is not None:
+            listings = [found.get(folder_name, {}) for folder_name, _, _ in to_scan]
+        elif len(to_scan) > 1:
+            with ThreadPoolExecutor(max_workers=min(INDEX_SCAN_WORKERS, len(to_scan))) as pool:
+                listings = list(pool.map(
+                    scan_recording_folder,
+                    [base_prefix + folder_name for folder_name, _, _ in to_scan]
+                ))
+        else:
+            listings = [scan_recording_folder(base_prefix + folder_name) for folder_name, _, _ in to_scan]
+
+        for (folder_name, state, mtime_ns), current in zip(to_scan, listings):
+            camera_id = state.camera_id
+            for filename, size in current.items():
+                previous = state.files.get(filename)
+                if previous is None:
+                    changes.added.append({
+                        "camera_id": camera_id,
+                        "folder_name": folder_name,
+                        "filename": filename,
+                        "start_time": parse_recording_filename(filename),
+                        "file_size": size
+                    })
+                elif previous != size:
+                    changes.resized.append({"b_folder": folder_name, "b_filename": filename, "b_size": size})
+
+            gone = [filename for filename in state.files if filename not in current]
+            if gone:
+                changes.removed.setdefault(folder_name, []).extend(gone)
+
+            state.files = current
+            state.mtime_ns = mtime_ns
+
+        return changes
+
+    async def sync(self):
+        """Bring the index up to date with the filesystem."""
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                cold = self._folders is None
+                if cold:
+                    self._folders = await self._load_index(db)
+
+                folders = await asyncio.to_thread(list_recording_folders, self.base_path)
+                # Every folder needs listing on a cold start: do it in one
+                # `find` call. It runs after the folder mtimes are read, so
+                # nothing written in between is missed.
+                found = await find_recordings(self.base_path) if cold and folders else None
+
+                # Look up only the cameras the folders on disk belong to
+                folder_camera_ids = {camera_id for camera_id, _, _ in folders.values() if camera_id is not None}
+                legacy_names = {legacy_name for _, legacy_name, _ in folders.values() if legacy_name is not None}
+                cameras = []
+                if folders:
+                    result = await db.execute(select(Camera.id, Camera.name_sanitized).where(or_(
+                        Camera.id.in_(folder_camera_ids),
+                        Camera.name_sanitized.in_(legacy_names)
+                    )))
+                    cameras = result.all()
+                camera_ids = {camera_id for camera_id, _ in cameras}
+                camera_by_name = {name_sanitized: camera_id for camera_id, name_sanitized in cameras if name_sanitized}
+                changes = await asyncio.to_thread(self._collect_changes, folders, camera_ids, camera_by_name, found)
+
+                try:
+                    for folder_name, filenames in changes.removed.items():
+                        await _delete_rows(db, folder_name, filenames)
+                    if changes.added:
+                        await db.execute(insert(RecordingFile.__table__), changes.added)
+                    if changes.resized:
+                        await db.execute(
+                            RecordingFile.__table__.update()
+                            .where(
+                                RecordingFile.folder_name == bindparam("b_folder"),
+                                RecordingFile.filename == bindparam("b_filename")
+                            )
+                            .values(file_size=bindparam("b_size")),
+                            changes.resized
+                        )
+                    await db.commit()
+                except Exception:
+                    self._folders = None  # State is ahead of the database now
+                    raise
+
+            self.last_sync = datetime.now()
+            if changes.added or changes.removed:
+                self.generation += 1
+                logger.info(
+                    f"Recording index synced: {len(changes.added)} added, "
+                    f"{sum(len(f) for f in changes.removed.values())} removed"
+                )
+
+    async def probe_durations(self):
+        """
+        Store the real duration of finished segments that don't have one yet,
+        a batch per sync. The newest segment of each folder is skipped: MediaMTX
+        may still be writing it.
+        """
+        if not self._folders:
+            return
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(RecordingFile.id, RecordingFile.folder_name, RecordingFile.filename, RecordingFile.file_size)
+                .where(RecordingFile.duration_seconds.is_(None))
+                .order_by(RecordingFile.start_time.desc())
+                # At most one row per folder is still being written
+                .limit(DURATION_PROBE_BATCH + len(self._folders))
+            )
+            pending = []
+            newest_by_folder: Dict[str, Optional[str]] = {}
+            for row in result:
+                if row.folder_name not in newest_by_folder:
+                    state = self._folders.get(row.folder_name)
+                    newest_by_folder[row.folder_name] = max(state.files) if state and state.files else None
+                if row.filename != newest_by_folder[row.folder_name]:
+                    pending.append(row)
+            pending = pending[:DURATION_PROBE_BATCH]
+            if not pending:
+                return
+
+            semaphore = asyncio.Semaphore(DURATION_PROBE_CONCURRENCY)
+
+            async def probe(row) -> Dict:
+                async with semaphore:
+                    duration = await probe_file_duration(f"{self.base_path}/{row.folder_name}/{row.filename}")
+                if duration is None:
+                    # Unreadable: keep the size estimate so it isn't retried every sync
+                    return {"b_id": row.id, "b_duration": get_file_duration_estimate(row.file_size)}
+                return {"b_id": row.id, "b_duration": round(duration)}
+
+            updates = await asyncio.gather(*(probe(row) for row in pending))
+            await db.execute(
+                RecordingFile.__table__.update()
+                .where(RecordingFile.id == bindparam("b_id"))
+                .values(duration_seconds=bindparam("b_duration")),
+                updates
+            )
+            await db.commit()
+            logger.debug(f"Probed the duration of {len(updates)} recordings")
+
+
+async def _delete_rows(db: AsyncSession, folder_name: str, filenames: List[str]):
+    """Delete the index rows of some recordings in a folder."""
+    # Chunked to stay under bind parameter limits
+    for i in range(0, len(filenames), 1000):
+        await db.execute(
+            delete(RecordingFile).where(
+                RecordingFile.folder_name == folder_name,
+                RecordingFile.filename.in_(filenames[i:i + 1000])
+            )
+        )
+
+
+async def remove_from_index(db: AsyncSession, recordings: List[Tuple[str, str]]):
+    """
+    Drop deleted recordings from the index right away, instead of waiting
+    for the next sync. Takes (folder_name, filename) pairs.
+    """
+    by_folder: Dict[str, List[str]] = {}
+    for folder_name, filename in recordings:
+        by_folder.setdefault(folder_name.replace("\\", "/").strip("/"), []).append(filename)
+    for folder_name, filenames in by_folder.items():
+        await _delete_rows(db, folder_name, filenames)
+    await db.commit()
+    recording_indexer.generation += 1
+
+
+# Global instance
+recording_indexer = RecordingIndexer()
+
+
+# =============================================================================
+# Startup/Shutdown Functions
+# =============================================================================
+
+async def start_recording_indexer():
+    """Start the recording indexer on application startup."""
+    await recording_indexer.start()
+
+
+async def stop_recording_indexer():
+    """Stop the recording indexer on application shutdown."""
+    await recording_indexer.stop()
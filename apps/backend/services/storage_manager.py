@@ -9,10 +9,10 @@ Handles:
 """
 import os
 import asyncio
+import heapq
 import logging
 import shutil
 from datetime import datetime, timedelta
-from glob import glob
 from typing import Optional, Tuple, List, Dict
 from pathlib import Path
 
@@ -76,20 +76,37 @@ def get_recording_files(base_path: str) -> List[Dict]:
     
     # Scan for MP4 files in all subdirectories
     # Structure: recordings/tenant/location/camera/*.mp4
-    for mp4_file in glob(os.path.join(base_path, "**", "*.mp4"), recursive=True):
+    # scandir gives the entry type with each name, so only .mp4 files are
+    # stat'ed; hidden entries are skipped, as glob did
+    pending = [base_path]
+    while pending:
         try:
-            stat = os.stat(mp4_file)
-            mtime = datetime.fromtimestamp(stat.st_mtime)
-            age_days = (now - mtime).days
-            
-            recordings.append({
-                "path": mp4_file,
-                "size": stat.st_size,
-                "mtime": mtime,
-                "age_days": age_days
-            })
-        except Exception as e:
-            logger.debug(f"Error reading file {mp4_file}: {e}")
+            entries = os.scandir(pending.pop())
+        except OSError as e:
+            logger.debug(f"Error listing {e.filename}: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir():
+                        pending.append(entry.path)
+                        continue
+                    if not entry.name.endswith(".mp4"):
+                        continue
+                    stat = entry.stat()
+                    mtime = datetime.fromtimestamp(stat.st_mtime)
+                    age_days = (now - mtime).days
+                    
+                    recordings.append({
+                        "path": entry.path,
+                        "size": stat.st_size,
+                        "mtime": mtime,
+                        "age_days": age_days
+                    })
+                except Exception as e:
+                    logger.debug(f"Error reading file {entry.path}: {e}")
     
     return recordings
 
@@ -202,17 +219,17 @@ def delete_oldest_recordings_until_space(
         return 0, 0
     
     bytes_to_free = required_free_bytes - current_free_bytes
-    recordings = get_recording_files(base_path)
     
-    # Sort by age (oldest first)
-    recordings.sort(key=lambda x: x["mtime"])
+    # Heap ordered by age: usually only a few of the oldest files have to go,
+    # so pop them one at a time instead of sorting every recording
+    recordings = [(rec["mtime"], i, rec) for i, rec in enumerate(get_recording_files(base_path))]
+    heapq.heapify(recordings)
     
     deleted_count = 0
     bytes_freed = 0
     
-    for rec in recordings:
-        if bytes_freed >= bytes_to_free:
-            break
+    while recordings and bytes_freed < bytes_to_free:
+        _, _, rec = heapq.heappop(recordings)
         
         try:
             os.remove(rec["path"])
@@ -227,21 +244,39 @@ def delete_oldest_recordings_until_space(
     return deleted_count, bytes_freed
 
 
+def _remove_empty_subdirectories(path: str) -> bool:
+    """
+    Remove empty directories below path, bottom-up.
+    Returns whether path itself is left empty.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError as e:
+        logger.debug(f"Could not list directory {path}: {e}")
+        return False
+    
+    # One scandir per directory: a subdirectory is empty when everything in
+    # it was removed, so there's no second listdir to check
+    empty = True
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False) and _remove_empty_subdirectories(entry.path):
+            try:
+                os.rmdir(entry.path)
+                logger.debug(f"Removed empty directory: {entry.path}")
+                continue
+            except OSError as e:
+                logger.debug(f"Could not remove directory {entry.path}: {e}")
+        empty = False
+    return empty
+
+
 def cleanup_empty_directories(base_path: str):
     """Remove empty directories in the recordings folder."""
     if not os.path.exists(base_path):
         return
     
-    # Walk bottom-up to delete empty dirs
-    for root, dirs, files in os.walk(base_path, topdown=False):
-        for dir_name in dirs:
-            dir_path = os.path.join(root, dir_name)
-            try:
-                if not os.listdir(dir_path):
-                    os.rmdir(dir_path)
-                    logger.debug(f"Removed empty directory: {dir_path}")
-            except Exception as e:
-                logger.debug(f"Could not remove directory {dir_path}: {e}")
+    _remove_empty_subdirectories(base_path)
 
 
 # =============================================================================
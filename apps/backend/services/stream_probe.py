@@ -0,0 +1,187 @@
+"""
+RTSP stream probing.
+
+Checks that an RTSP URL serves a video stream and extracts basic codec info.
+Uses PyAV (libav in-process) when it is installed, so testing a camera does
+not have to spawn an ffprobe process; otherwise callers fall back to ffprobe.
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+try:
+    import av
+except ImportError:
+    av = None
+
+
+# Video codecs reported back to the UI
+VIDEO_CODECS = ["h264", "h265", "hevc", "mjpeg"]
+
+# Hard cap on how long an ffprobe process may run, whatever timeout is requested
+FFPROBE_TIMEOUT_S = 30
+
+
+def pyav_available() -> bool:
+    """Whether in-process probing with PyAV is available."""
+    return av is not None
+
+
+@lru_cache(maxsize=1)
+def get_ffprobe_path() -> Optional[str]:
+    """
+    Absolute path of the ffprobe binary, or None if it is not installed.
+    Resolved once per process so each probe skips the PATH search.
+    """
+    return shutil.which("ffprobe")
+
+
+def probe_rtsp_pyav(rtsp_url: str, timeout: float) -> Optional[dict]:
+    """
+    Open an RTSP stream with PyAV and return info about its video track.
+
+    Blocking: run it in an executor. The socket/read timeouts are passed to
+    libav explicitly because its RTSP default is to wait forever.
+
+    Args:
+        rtsp_url: RTSP URL to probe
+        timeout: Connect/read timeout in seconds
+
+    Returns:
+        Dict with codec, width, height and framerate, or None if the stream
+        has no supported video track
+
+    Raises:
+        av.error.FFmpegError: If the stream cannot be opened
+    """
+    timeout_us = str(int(timeout * 1_000_000))
+    container = av.open(
+        rtsp_url,
+        options={
+            "rtsp_transport": "tcp",
+            "timeout": timeout_us,
+            "rw_timeout": timeout_us,
+        },
+        timeout=(timeout, timeout),
+    )
+    try:
+        for stream in container.streams.video:
+            codec = stream.codec_context.name
+            if codec in VIDEO_CODECS:
+                rate = stream.average_rate or stream.guessed_rate
+                return {
+                    "codec": codec,
+                    "width": stream.codec_context.width,
+                    "height": stream.codec_context.height,
+                    "framerate": f"{rate.numerator}/{rate.denominator}" if rate else None
+                }
+        return None
+    finally:
+        container.close()
+
+
+def probe_file_duration_pyav(path: str) -> Optional[float]:
+    """
+    Read the duration of a media file, in seconds, with PyAV.
+
+    Blocking: run it in an executor. Only the container headers are read.
+
+    Returns:
+        Duration in seconds, or None if the container doesn't report one
+
+    Raises:
+        av.error.FFmpegError: If the file cannot be opened
+    """
+    container = av.open(path)
+    try:
+        if container.duration is not None:
+            return container.duration / av.time_base
+        for stream in container.streams.video:
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+        return None
+    finally:
+        container.close()
+
+
+def _kill_process_group(process: asyncio.subprocess.Process):
+    """Kill a process started in its own group, including any children."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def run_ffprobe(args: List[str], timeout: float) -> Tuple[int, bytes, bytes]:
+    """
+    Run ffprobe with `args` and return (returncode, stdout, stderr).
+
+    ffprobe is started in its own process group. If it hasn't exited after
+    `timeout` seconds (capped at FFPROBE_TIMEOUT_S), or the caller is
+    cancelled, the whole group is killed.
+
+    Raises:
+        FileNotFoundError: If ffprobe is not installed
+        asyncio.TimeoutError: If ffprobe didn't finish in time
+    """
+    ffprobe = get_ffprobe_path()
+    if ffprobe is None:
+        raise FileNotFoundError("ffprobe")
+
+    if os.name == "posix":
+        group_kwargs = {"start_new_session": True}
+    else:
+        group_kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+    process = await asyncio.create_subprocess_exec(
+        ffprobe,
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **group_kwargs
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(),
+            timeout=min(timeout, FFPROBE_TIMEOUT_S)
+        )
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        _kill_process_group(process)
+        await process.wait()
+        raise
+    return process.returncode, stdout, stderr
+
+
+async def probe_file_duration(path: str) -> Optional[float]:
+    """
+    Duration of a media file in seconds, read with PyAV when it is installed
+    and with ffprobe otherwise. None if it can't be determined.
+    """
+    if av is not None:
+        try:
+            return await asyncio.to_thread(probe_file_duration_pyav, path)
+        except Exception:
+            return None
+
+    try:
+        returncode, stdout, _ = await run_ffprobe(
+            ["-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            timeout=FFPROBE_TIMEOUT_S
+        )
+    except (FileNotFoundError, asyncio.TimeoutError):
+        return None
+    if returncode != 0:
+        return None
+    try:
+        return float(stdout.strip())
+    except ValueError:
+        return None
@@ -246,12 +246,11 @@ export const RecordingsGallery = () => {
     }
   }
 
-  // Download recording as zip
+  // Download recording as mp4
   const downloadRecording = async (recording: Recording) => {
     const url = `${API_URL}/api/recordings/download/${recording.folder_name}/${recording.filename}`
-    const filename = recording.filename.replace(".mp4", ".zip")
     try {
-      await downloadWithProgress(url, undefined, filename, 1)
+      await downloadWithProgress(url, undefined, recording.filename, 1)
     } catch {
       alert("Error al descargar la grabación")
     }